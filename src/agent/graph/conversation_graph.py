@@ -2,6 +2,7 @@
 from langgraph.graph import StateGraph, END
 from src.agent.graph.state import ConversationState
 from src.agent.graph.nodes import (
+    turn_start,
     input_processor,
     policy_engine_node,
     eligibility_checker,
@@ -12,6 +13,7 @@ from src.agent.graph.nodes import (
     state_updater,
     special_case_handler,
     excel_writer,
+    agent_reply,
     # Supervisor Robusto - Optimizado
     pre_analyzer_node,  # Ahora usa simple_analyzer (basado en reglas, sin LLM)
     context_enricher_node,
@@ -27,7 +29,8 @@ def create_conversation_graph():
     ARQUITECTURA OPTIMIZADA (1 LLM call):
 
     Graph Flow (per turn):
-    START -> input_processor
+    START -> turn_start (sella el timestamp del turno)
+          -> input_processor
           -> pre_analyzer (análisis basado en REGLAS, ~5ms - antes era LLM ~2000ms)
           -> context_enricher (inyecta políticas/casos)
           -> policy_engine -> eligibility_checker -> escalation_detector
@@ -37,9 +40,11 @@ def create_conversation_graph():
                   -> response_validator (validación por reglas)
                   -> response_processor
                   -> [conditional: route_after_llm]
-                      -> END: excel_writer -> END
-                      -> special: special_case_handler -> END
-                      -> continue: state_updater -> END
+                      -> END: excel_writer -> agent_reply -> END
+                      -> special: special_case_handler -> agent_reply -> END
+                      -> continue: state_updater -> agent_reply -> END
+
+    agent_reply agrega la respuesta final a messages (reducer add_messages).
 
     OPTIMIZACIÓN: Antes había 2 llamadas LLM (pre_analyzer + llm_responder).
     Ahora pre_analyzer usa regex/reglas, reduciendo latencia de ~6s a ~3s.
@@ -49,6 +54,7 @@ def create_conversation_graph():
     graph = StateGraph(ConversationState)
     print("===============COMPILANDO GRAFO============")
     # Add all nodes (Supervisor Robusto - Optimizado)
+    graph.add_node("turn_start", turn_start)
     graph.add_node("input_processor", input_processor)
     graph.add_node("pre_analyzer", pre_analyzer_node)  # OPTIMIZADO: Ahora usa reglas, no LLM (~5ms vs ~2000ms)
     graph.add_node("context_enricher", context_enricher_node)
@@ -62,9 +68,11 @@ def create_conversation_graph():
     graph.add_node("state_updater", state_updater)
     graph.add_node("special_case_handler", special_case_handler)
     graph.add_node("excel_writer", excel_writer)
+    graph.add_node("agent_reply", agent_reply)
 
     # Define edges (linear flow con Supervisor Robusto)
-    graph.set_entry_point("input_processor")
+    graph.set_entry_point("turn_start")
+    graph.add_edge("turn_start", "input_processor")
 
     # Flujo con Supervisor: pre_analyzer y context_enricher después de input
     graph.add_edge("input_processor", "pre_analyzer")  # NUEVO
@@ -99,10 +107,11 @@ def create_conversation_graph():
         }
     )
 
-    # Final: All paths go to END (no loops!)
-    graph.add_edge("special_case_handler", END)
-    graph.add_edge("excel_writer", END)
-    graph.add_edge("state_updater", END)
+    # Final: All paths record the reply and go to END (no loops!)
+    graph.add_edge("special_case_handler", "agent_reply")
+    graph.add_edge("excel_writer", "agent_reply")
+    graph.add_edge("state_updater", "agent_reply")
+    graph.add_edge("agent_reply", END)
 
     # Compile graph
     return graph.compile()
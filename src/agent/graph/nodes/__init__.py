@@ -1,4 +1,5 @@
 # Nodes module - Con Supervisor Robusto (Optimizado)
+from src.agent.graph.nodes.turn_start import turn_start
 from src.agent.graph.nodes.input_processor import input_processor
 from src.agent.graph.nodes.policy_engine_node import policy_engine_node
 from src.agent.graph.nodes.eligibility_checker import eligibility_checker
@@ -9,6 +10,7 @@ from src.agent.graph.nodes.response_processor import response_processor
 from src.agent.graph.nodes.state_updater import state_updater
 from src.agent.graph.nodes.special_case_handler import special_case_handler
 from src.agent.graph.nodes.excel_writer import excel_writer
+from src.agent.graph.nodes.agent_reply import agent_reply
 
 # Supervisor Robusto - Optimizado (sin LLM extra)
 from src.agent.graph.nodes.simple_analyzer import simple_analyzer_node  # Reemplaza pre_analyzer (basado en reglas)
@@ -19,10 +21,10 @@ from src.agent.graph.nodes.response_validator import response_validator_node
 pre_analyzer_node = simple_analyzer_node
 
 __all__ = [
-    'input_processor', 'policy_engine_node', 'eligibility_checker',
+    'turn_start', 'input_processor', 'policy_engine_node', 'eligibility_checker',
     'escalation_detector', 'context_builder',
     'llm_responder', 'response_processor',
-    'state_updater', 'special_case_handler', 'excel_writer',
+    'state_updater', 'special_case_handler', 'excel_writer', 'agent_reply',
     # Supervisor Robusto (optimizado)
     'simple_analyzer_node', 'pre_analyzer_node', 'context_enricher_node', 'response_validator_node'
 ]
@@ -0,0 +1,10 @@
+# Agent reply node - record the turn's response in the message history
+from typing import Dict, Any
+from langchain_core.messages import AIMessage
+
+def agent_reply(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Append the final agent_response as an AIMessage (merged by the add_messages reducer)"""
+    agent_response = state.get('agent_response')
+    if not agent_response:
+        return {}
+    return {'messages': [AIMessage(content=agent_response)]}
@@ -3,6 +3,7 @@ from typing import Dict, Any
 import logging
 from src.agent.prompts.prompt_builder import build_prompt
 from src.agent.context_builder import get_context_builder
+from src.agent.graph.state import last_human_content
 from src.domain.value_objects.conversation_phase import ConversationPhase
 
 logger = logging.getLogger(__name__)
@@ -30,15 +31,7 @@ def context_builder(state: Dict[str, Any]) -> Dict[str, Any]:
         phase = ConversationPhase.GREETING
 
     # Obtener último mensaje del usuario
-    messages = state.get("messages", [])
-    last_user_message = ""
-    for msg in reversed(messages):
-        if isinstance(msg, dict) and msg.get("role") == "user":
-            last_user_message = msg.get("content", "")
-            break
-        elif hasattr(msg, "type") and msg.type == "human":
-            last_user_message = msg.content
-            break
+    last_user_message = last_human_content(state.get("messages", []))
 
     # Construir contexto base (formateo de fechas + alertas)
     context_agent = get_context_builder()
@@ -1,5 +1,6 @@
 # Escalation detector node
 from typing import Dict, Any
+from src.agent.graph.state import last_human_content
 
 ESCALATION_KEYWORDS = [
     'servicio expreso', 'servicio express', 'urgente ya', 'inmediato',
@@ -24,12 +25,8 @@ def escalation_detector(state: Dict[str, Any]) -> Dict[str, Any]:
     # Check last message for keywords
     messages = state.get('messages', [])
     if messages:
-        last_msg = ''
-        for msg in reversed(messages):
-            if hasattr(msg, 'type') and msg.type == 'human':
-                last_msg = msg.content.lower()
-                break
-        
+        last_msg = last_human_content(messages).lower()
+
         for keyword in ESCALATION_KEYWORDS:
             if keyword in last_msg:
                 reasons.append(f'Usuario menciono: {keyword}')
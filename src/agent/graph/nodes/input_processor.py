@@ -1,7 +1,7 @@
 # Input processor node
 from typing import Dict, Any
 from langchain_core.messages import HumanMessage
-from datetime import datetime
+from datetime import datetime, timezone
 
 def input_processor(state: Dict[str, Any]) -> Dict[str, Any]:
     """Process user input and update state"""
@@ -18,6 +18,6 @@ def input_processor(state: Dict[str, Any]) -> Dict[str, Any]:
     state['turn_count'] = state.get('turn_count', 0) + 1
     
     # Update timestamp
-    state['updated_at'] = datetime.utcnow().isoformat()
+    state['updated_at'] = state.get('_current_timestamp') or datetime.now(timezone.utc).isoformat()
     
     return state
@@ -2,11 +2,13 @@
 import json
 import logging
 import os
+import orjson
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage
 from src.infrastructure.logging import get_logger
 from src.agent.graph.nodes.context_builder import context_builder as build_context_prompt
+from src.agent.graph.state import last_human_content
 from src.infrastructure.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -20,13 +22,14 @@ def _get_llm() -> ChatOpenAI:
     """Return a cached ChatOpenAI instance, creating it on first call."""
     global _cached_llm, _cached_llm_config
 
+    openai_model = settings.OPENAI_MODEL
     llm_kwargs = {
         "openai_api_key": settings.OPENAI_API_KEY,
-        "model": settings.OPENAI_MODEL,
+        "model": openai_model,
         "temperature": settings.OPENAI_TEMPERATURE,
         "max_tokens": settings.OPENAI_MAX_TOKENS,
     }
-    model_name = (settings.OPENAI_MODEL or "").lower()
+    model_name = (openai_model or "").lower()
     if "gpt-4o" in model_name or "gpt-4" in model_name:
         llm_kwargs["response_format"] = {"type": "json_object"}
 
@@ -36,7 +39,7 @@ def _get_llm() -> ChatOpenAI:
 
     _cached_llm = ChatOpenAI(**llm_kwargs)
     _cached_llm_config = llm_kwargs
-    logger.info(f"ChatOpenAI instance created (model={settings.OPENAI_MODEL})")
+    logger.info(f"ChatOpenAI instance created (model={openai_model})")
     return _cached_llm
 
 
@@ -50,6 +53,70 @@ def _truncate_preview(value: str | None, limit: int) -> str:
     return f"{cleaned[:limit-3]}..."
 
 
+_AGENT_RESPONSE_KEY = '"agent_response"'
+# Re-scan the partial JSON buffer every N streamed chunks
+_STREAM_SCAN_EVERY = 5
+
+
+def _scan_agent_response(buffer: str) -> str | None:
+    """
+    Return the `agent_response` value from a partially streamed JSON object.
+
+    Simple state machine: locate the key, skip to the opening quote of its
+    value and walk until the first unescaped closing quote. Returns None
+    while the value is still incomplete.
+    """
+    key_pos = buffer.find(_AGENT_RESPONSE_KEY)
+    if key_pos == -1:
+        return None
+    colon = buffer.find(":", key_pos + len(_AGENT_RESPONSE_KEY))
+    if colon == -1:
+        return None
+    start = buffer.find('"', colon + 1)
+    if start == -1:
+        return None
+
+    escaped = False
+    for i in range(start + 1, len(buffer)):
+        ch = buffer[i]
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            try:
+                return orjson.loads(buffer[start:i + 1])
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def _stream_llm_output(llm: ChatOpenAI, llm_messages: list, response_queue=None, **invoke_kwargs) -> str:
+    """
+    Stream the LLM completion and return the full raw output.
+
+    As soon as the `agent_response` field is complete it is pushed to
+    `response_queue` (any object with `put_nowait`, e.g. a TTS queue) so
+    synthesis can start while `next_phase`/`extracted` are still arriving.
+    Validation still runs on the complete output.
+    """
+    chunks = []
+    early_response = None
+    for chunk in llm.stream(llm_messages, **invoke_kwargs):
+        chunks.append(chunk.content or "")
+        if early_response is None and len(chunks) % _STREAM_SCAN_EVERY == 0:
+            early_response = _scan_agent_response("".join(chunks))
+            if early_response is not None and response_queue is not None:
+                response_queue.put_nowait(early_response)
+
+    llm_output = "".join(chunks)
+    if early_response is None and response_queue is not None:
+        early_response = _scan_agent_response(llm_output)
+        if early_response is not None:
+            response_queue.put_nowait(early_response)
+    return llm_output
+
+
 def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[str, Any]:
     """Call LLM to generate response using optimized prompt"""
 
@@ -69,17 +136,11 @@ def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[
         state["next_phase"] = state.get("current_phase", "GREETING")
         return state
 
-    # Get conversation history (last few messages)
+    # Get conversation history. The add_messages reducer coerces every
+    # entry (including dicts restored from Redis) to a BaseMessage at graph
+    # entry, so a single shape is handled below.
     messages = state.get("messages", [])
-    last_user_message = None
-    for msg in reversed(messages):
-        if isinstance(msg, dict):
-            if msg.get("role") == "user":
-                last_user_message = msg.get("content", "")
-                break
-        elif hasattr(msg, "type") and msg.type == "human":
-            last_user_message = msg.content
-            break
+    last_user_message = last_human_content(messages)
 
     if not last_user_message:
         logger.warning("No user message found in state")
@@ -90,30 +151,14 @@ def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[
     try:
         # Get cached LLM instance (avoids ~800ms reinit per call)
         llm = _get_llm()
+        # Settings as used to build the LLM (read once, reused for logging)
+        llm_kwargs_snapshot = _cached_llm_config
 
         # Build messages for LLM with full conversation history
-        llm_messages = [SystemMessage(content=system_prompt)]
-
-        # Add conversation history (all messages)
-        for msg in messages:
-            if isinstance(msg, dict):
-                # Dict format (from Redis)
-                role = msg.get("role")
-                content = msg.get("content", "")
-                if role == "user":
-                    llm_messages.append(HumanMessage(content=content))
-                elif role == "assistant":
-                    from langchain_core.messages import AIMessage
-                    llm_messages.append(AIMessage(content=content))
-            elif hasattr(msg, "type"):
-                # LangChain message format
-                llm_messages.append(msg)
-
-        policy_ids = [
-            violation.get("policy_id") or violation.get("policy_name") or "desconocida"
-            for violation in state.get("policy_violations", [])
-            if isinstance(violation, dict)
-        ]
+        llm_messages = [SystemMessage(content=system_prompt), *messages]
+
+        # Precomputed by policy_engine_node
+        policy_ids = state.get("policy_ids", [])
         logger_preview = get_logger()
         logger_preview.log_langgraph_state(
             session_id=state.get("session_id", "unknown"),
@@ -129,11 +174,11 @@ def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[
         )
 
         # Call LLM
-        print(f"\n🧠 [AGENT B] OpenAI GPT ({settings.OPENAI_MODEL}) - Generando respuesta...")
+        print(f"\n🧠 [AGENT B] OpenAI GPT ({llm_kwargs_snapshot['model']}) - Generando respuesta...")
         print(f"   ➤ Prompt: {len(system_prompt)} caracteres (~{len(system_prompt.split())} palabras)")
         print(f"   ➤ Historial: {len(messages)} mensajes")
-        print(f"   ➤ Temperatura: {settings.OPENAI_TEMPERATURE}")
-        print(f"   ➤ Max tokens: {settings.OPENAI_MAX_TOKENS}")
+        print(f"   ➤ Temperatura: {llm_kwargs_snapshot['temperature']}")
+        print(f"   ➤ Max tokens: {llm_kwargs_snapshot['max_tokens']}")
         logger.info(f"Calling LLM for phase: {state.get('current_phase')}")
 
         # ALWAYS print prompts for debugging (truncated in console, full in file)
@@ -144,16 +189,7 @@ def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[
         print(f"\n{'─'*80}")
         print(f"💬 HISTORIAL DE CONVERSACIÓN ({len(messages)} mensajes):")
         for i, msg in enumerate(messages[-5:], 1):  # Show last 5 messages
-            if isinstance(msg, dict):
-                role = msg.get("role", "unknown")
-                content = msg.get("content", "")[:100]
-            elif hasattr(msg, "type"):
-                role = msg.type
-                content = msg.content[:100] if hasattr(msg, "content") else ""
-            else:
-                role = "unknown"
-                content = str(msg)[:100]
-            print(f"   {i}. [{role}]: {content}...")
+            print(f"   {i}. [{msg.type}]: {msg.content[:100]}...")
         print(f"{'─'*80}\n")
 
         print(f"⏳ Esperando respuesta del LLM...")
@@ -163,16 +199,20 @@ def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[
         if config and config.get("callbacks"):
             llm_invoke_kwargs["config"] = {"callbacks": config["callbacks"]}
 
+        # Optional downstream consumer (TTS) for the early agent_response
+        response_queue = None
+        if config:
+            response_queue = (config.get("configurable") or {}).get("agent_response_queue")
+
         #print("==========LO QUE SE MANDA==========================",llm_messages)
-        response = llm.invoke(llm_messages, **llm_invoke_kwargs)
-        llm_output = response.content
+        llm_output = _stream_llm_output(llm, llm_messages, response_queue, **llm_invoke_kwargs)
         print("=======================LO QUE DEVUELVE=======================", llm_output)
         state["_llm_raw_output"] = llm_output
         print(f"✅ Respuesta recibida del LLM\n")
 
         # Parse JSON response
         try:
-            parsed = json.loads(llm_output)
+            parsed = orjson.loads(llm_output)
             state["agent_response"] = parsed.get("agent_response", "")
             state["next_phase"] = parsed.get("next_phase", state.get("current_phase", "GREETING"))
             state["requires_escalation"] = parsed.get("requires_escalation", False)
@@ -230,6 +270,14 @@ def llm_responder(state: Dict[str, Any], config: Dict[str, Any] = None) -> Dict[
     return state
 
 
+# Keyword groups for _validate_response_rules (substring hit-tests)
+_SENSITIVE_KEYWORDS = ('documento', 'dirección', 'cita', 'servicio', 'fecha', 'hora')
+_SUMMARY_KEYWORDS = ('confirmar', 'queda registrado', 'resumen', 'para confirmar', 'entonces')
+_DATE_REF_KEYWORDS = ('fecha', 'día', 'enero', 'febrero', 'marzo', 'lunes', 'martes')
+_TIME_REF_KEYWORDS = ('hora', ':')
+_SERVICE_REF_KEYWORDS = ('terapia', 'diálisis', 'cita', 'servicio')
+
+
 def _validate_response_rules(response: str, state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate LLM response using RULES (not LLM) to detect critical errors.
@@ -255,6 +303,7 @@ def _validate_response_rules(response: str, state: Dict[str, Any]) -> Dict[str,
     from datetime import datetime
 
     errors = []
+    resp_lower = response.casefold()
 
     # 1. LOGICAL FAILURE: Incorrect dates mentioned
     appointment_date = state.get('appointment_date')
@@ -308,8 +357,7 @@ def _validate_response_rules(response: str, state: Dict[str, Any]) -> Dict[str,
             age_int = int(contact_age)
             if age_int < 18:
                 # Check if response contains sensitive data
-                sensitive_keywords = ['documento', 'dirección', 'cita', 'servicio', 'fecha', 'hora']
-                if any(keyword in response.lower() for keyword in sensitive_keywords):
+                if any(keyword in resp_lower for keyword in _SENSITIVE_KEYWORDS):
                     errors.append("Revelando datos sensibles a menor de edad (age<18)")
         except (ValueError, TypeError):
             pass
@@ -324,13 +372,12 @@ def _validate_response_rules(response: str, state: Dict[str, Any]) -> Dict[str,
     next_phase = state.get('next_phase', '')
     if next_phase in ['END', 'OUTBOUND_CLOSING']:
         # Check if response includes confirmation/summary keywords
-        summary_keywords = ['confirmar', 'queda registrado', 'resumen', 'para confirmar', 'entonces']
-        has_summary = any(keyword in response.lower() for keyword in summary_keywords)
+        has_summary = any(keyword in resp_lower for keyword in _SUMMARY_KEYWORDS)
 
         # Also check if it includes critical data (date, time, service)
-        has_date_ref = any(word in response.lower() for word in ['fecha', 'día', 'enero', 'febrero', 'marzo', 'lunes', 'martes'])
-        has_time_ref = any(word in response.lower() for word in ['hora', ':'])
-        has_service_ref = any(word in response.lower() for word in ['terapia', 'diálisis', 'cita', 'servicio'])
+        has_date_ref = any(word in resp_lower for word in _DATE_REF_KEYWORDS)
+        has_time_ref = any(word in resp_lower for word in _TIME_REF_KEYWORDS)
+        has_service_ref = any(word in resp_lower for word in _SERVICE_REF_KEYWORDS)
 
         # If closing, should have either summary keyword OR all three references
         if not (has_summary or (has_date_ref and has_time_ref and has_service_ref)):
@@ -2,9 +2,13 @@
 from typing import Dict, Any
 from src.agent.policies import PolicyEngine
 
+# One engine per process: its per-(phase, direction) tables are built once
+_ENGINE = PolicyEngine()
+
+
 def policy_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """Evaluate policies against current state"""
-    engine = PolicyEngine()
+    engine = _ENGINE
     
     phase = state.get('current_phase', 'GREETING')
     direction = state.get('call_direction', 'INBOUND')
@@ -23,6 +27,10 @@ def policy_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
         }
         for v in result.violations
     ]
+    state['policy_ids'] = [
+        v.policy_id or v.policy_name or 'desconocida'
+        for v in result.violations
+    ]
     state['policy_context_injected'] = result.prompt_injection
     
     return state
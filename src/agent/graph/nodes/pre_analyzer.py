@@ -7,10 +7,12 @@ Ejecuta análisis rápido con gpt-4o-mini para:
 3. Identificar temas/políticas relevantes
 """
 import os
+import re
 import json
 import logging
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
+from src.agent.graph.state import last_human_content
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -39,6 +41,28 @@ Reglas:
 - policy_keywords: solo incluye si el mensaje toca esos temas"""
 
 
+_DEFAULT_ANALYSIS = {
+    "emotion": "neutro",
+    "emotion_level": "bajo",
+    "intent": "otro",
+    "topic": "otro",
+    "needs_empathy": False,
+}
+
+# Respuestas cortas frecuentes resueltas localmente (sin llamada LLM)
+_FAST_PATH_NORMALIZE = re.compile(r'[^\wáéíóúñ]')
+_FAST_PATH = {
+    **dict.fromkeys(
+        ["si", "sí", "ok", "okay", "claro", "vale", "listo", "correcto", "exacto", "dale"],
+        {"intent": "confirmar"},
+    ),
+    **dict.fromkeys(["no", "nop", "negativo"], {"intent": "negar"}),
+    **dict.fromkeys(["gracias", "muchasgracias"], {"emotion": "positivo"}),
+    **dict.fromkeys(["adios", "adiós", "chao"], {}),
+    **dict.fromkeys(["hola", "alo", "aló", "buenas"], {"intent": "saludo"}),
+}
+
+
 class PreAnalyzer:
     """Analizador de intención y emoción con LLM pequeño."""
 
@@ -63,6 +87,13 @@ class PreAnalyzer:
         Returns:
             Dict con análisis: emotion, intent, topic, etc.
         """
+        norm = _FAST_PATH_NORMALIZE.sub('', message.lower().strip())[:20]
+        fast = _FAST_PATH.get(norm)
+        if fast is not None:
+            analysis = {**_DEFAULT_ANALYSIS, **fast, "policy_keywords": []}
+            logger.info(f"[PRE_ANALYZER] fast-path '{norm}' | {analysis['intent']}")
+            return analysis
+
         prompt = ANALYZER_PROMPT.format(
             message=message[:200],  # Limitar para reducir tokens
             phase=phase,
@@ -84,11 +115,8 @@ class PreAnalyzer:
             analysis = json.loads(content)
 
             # Validar campos requeridos
-            analysis.setdefault("emotion", "neutro")
-            analysis.setdefault("emotion_level", "bajo")
-            analysis.setdefault("intent", "otro")
-            analysis.setdefault("topic", "otro")
-            analysis.setdefault("needs_empathy", False)
+            for key, default in _DEFAULT_ANALYSIS.items():
+                analysis.setdefault(key, default)
             analysis.setdefault("policy_keywords", [])
 
             logger.info(f"[PRE_ANALYZER] {analysis['emotion']}({analysis['emotion_level']}) | {analysis['intent']} | {analysis['topic']}")
@@ -97,14 +125,7 @@ class PreAnalyzer:
         except Exception as e:
             logger.error(f"[PRE_ANALYZER] Error: {e}")
             # Fallback seguro
-            return {
-                "emotion": "neutro",
-                "emotion_level": "bajo",
-                "intent": "otro",
-                "topic": "otro",
-                "needs_empathy": False,
-                "policy_keywords": []
-            }
+            return {**_DEFAULT_ANALYSIS, "policy_keywords": []}
 
 
 # Singleton
@@ -133,15 +154,7 @@ def pre_analyzer_node(state: Dict[str, Any], config: Dict[str, Any] = None) -> D
     print("="*60)
 
     # Obtener último mensaje del usuario
-    messages = state.get("messages", [])
-    last_message = ""
-    for msg in reversed(messages):
-        if isinstance(msg, dict) and msg.get("role") == "user":
-            last_message = msg.get("content", "")
-            break
-        elif hasattr(msg, "type") and msg.type == "human":
-            last_message = msg.content
-            break
+    last_message = last_human_content(state.get("messages", []))
 
     if not last_message:
         return state
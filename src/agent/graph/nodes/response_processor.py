@@ -6,6 +6,25 @@ from src.infrastructure.logging import get_logger
 logger = logging.getLogger(__name__)
 conv_logger = get_logger().logger
 
+# Campos que se copian tal cual desde extracted_data cuando traen valor
+_MERGE_KEYS = frozenset({
+    "patient_full_name",
+    "document_type",
+    "document_number",
+    "eps",
+    "contact_name",
+    "contact_relationship",
+    "contact_age",
+    "service_type",
+    "appointment_date",
+    "appointment_time",
+    "pickup_address",
+    "special_observation",
+})
+
+# Campos que además se registran en el log al extraerse
+_LOGGED_KEYS = frozenset({"contact_name", "contact_relationship", "contact_age", "special_observation"})
+
 
 def _calculate_adjusted_time(base_time: str, adjustment_minutes: int) -> Optional[str]:
     """
@@ -30,12 +49,12 @@ def _calculate_adjusted_time(base_time: str, adjustment_minutes: int) -> Optiona
         # Handle negative (would be previous day) - clamp to 00:00
         if total_minutes < 0:
             total_minutes = 0
-            logger.warning(f"Adjusted time would be negative, clamping to 00:00")
+            logger.warning("Adjusted time would be negative, clamping to 00:00")
 
         # Handle overflow (would be next day) - clamp to 23:59
         if total_minutes >= 24 * 60:
             total_minutes = 24 * 60 - 1
-            logger.warning(f"Adjusted time would overflow, clamping to 23:59")
+            logger.warning("Adjusted time would overflow, clamping to 23:59")
 
         new_hour = total_minutes // 60
         new_minute = total_minutes % 60
@@ -43,7 +62,7 @@ def _calculate_adjusted_time(base_time: str, adjustment_minutes: int) -> Optiona
         return f"{new_hour:02d}:{new_minute:02d}"
 
     except Exception as e:
-        logger.error(f"Error calculating adjusted time: {e}")
+        logger.error("Error calculating adjusted time: %s", e)
         return None
 
 
@@ -61,7 +80,7 @@ def response_processor(state: Dict[str, Any]) -> Dict[str, Any]:
             "current_phase": state.get("current_phase"),
             "next_phase": state.get("next_phase"),
             "has_extracted": bool(extracted),
-            "extracted_keys": list(extracted.keys()) if isinstance(extracted, dict) else [],
+            "extracted_keys": list(extracted) if isinstance(extracted, dict) else (),
         }
     )
 
@@ -71,54 +90,19 @@ def response_processor(state: Dict[str, Any]) -> Dict[str, Any]:
         return state
 
     # Merge extracted data into state
-    # Patient data
-    if extracted.get("patient_full_name"):
-        state["patient_full_name"] = extracted["patient_full_name"]
-
-    if extracted.get("document_type"):
-        state["document_type"] = extracted["document_type"]
-
-    if extracted.get("document_number"):
-        state["document_number"] = extracted["document_number"]
-
-    if extracted.get("eps"):
-        state["eps"] = extracted["eps"]
-
-    # Contact data (for outbound calls with family/friends)
-    if extracted.get("contact_name"):
-        state["contact_name"] = extracted["contact_name"]
-        logger.info(f"Contact name extracted: {extracted['contact_name']}")
-        print(f"✅ Dato extraído: contact_name = '{extracted['contact_name']}'")
-
-    if extracted.get("contact_relationship"):
-        state["contact_relationship"] = extracted["contact_relationship"]
-        logger.info(f"Contact relationship extracted: {extracted['contact_relationship']}")
-        print(f"✅ Dato extraído: contact_relationship = '{extracted['contact_relationship']}'")
-
-    if extracted.get("contact_age"):
-        state["contact_age"] = extracted["contact_age"]
-        logger.info(f"Contact age extracted: {extracted['contact_age']}")
-        print(f"✅ Dato extraído: contact_age = '{extracted['contact_age']}'")
-
-    # Service data
-    if extracted.get("service_type"):
-        state["service_type"] = extracted["service_type"]
-
-    if extracted.get("appointment_date"):
-        state["appointment_date"] = extracted["appointment_date"]
-
-    if extracted.get("appointment_time"):
-        state["appointment_time"] = extracted["appointment_time"]
-
-    if extracted.get("pickup_address"):
-        state["pickup_address"] = extracted["pickup_address"]
+    # (patient, contact and service data; one pass over what the LLM returned,
+    # a single set probe per provided key)
+    delta = {key: value for key, value in extracted.items() if value and key in _MERGE_KEYS}
+    state.update(delta)
+    for key in _LOGGED_KEYS.intersection(delta):
+        logger.info("%s extracted: %s", key, delta[key])
 
     # Pickup time adjustment (for schedule changes)
     if extracted.get("pickup_time_adjustment") is not None:
         try:
             adjustment = int(extracted["pickup_time_adjustment"])
             state["pickup_time_adjustment"] = adjustment
-            logger.info(f"Pickup time adjustment extracted: {adjustment} minutes")
+            logger.info("Pickup time adjustment extracted: %s minutes", adjustment)
             print(f"✅ Dato extraído: pickup_time_adjustment = {adjustment} minutos")
 
             # Calculate new pickup time if we have the base pickup_time
@@ -126,42 +110,38 @@ def response_processor(state: Dict[str, Any]) -> Dict[str, Any]:
                 new_pickup = _calculate_adjusted_time(state["pickup_time"], adjustment)
                 if new_pickup:
                     state["pickup_time"] = new_pickup
-                    logger.info(f"New pickup time calculated: {new_pickup}")
+                    logger.info("New pickup time calculated: %s", new_pickup)
                     print(f"✅ Nueva hora de recogida calculada: {new_pickup}")
         except (ValueError, TypeError) as e:
-            logger.warning(f"Invalid pickup_time_adjustment value: {extracted['pickup_time_adjustment']}")
+            logger.warning("Invalid pickup_time_adjustment value: %s", extracted['pickup_time_adjustment'])
 
     if extracted.get("new_pickup_time"):
         state["pickup_time"] = extracted["new_pickup_time"]
-        logger.info(f"New pickup time extracted: {extracted['new_pickup_time']}")
+        logger.info("New pickup time extracted: %s", extracted['new_pickup_time'])
         print(f"✅ Dato extraído: new_pickup_time = '{extracted['new_pickup_time']}'")
 
     # New appointment date/time (for rescheduling)
     if extracted.get("new_appointment_date"):
         state["new_appointment_date"] = extracted["new_appointment_date"]
         state["date_change_detected"] = True
-        logger.info(f"New appointment date extracted: {extracted['new_appointment_date']}")
+        logger.info("New appointment date extracted: %s", extracted['new_appointment_date'])
         print(f"✅ Dato extraído: new_appointment_date = '{extracted['new_appointment_date']}'")
 
     if extracted.get("new_appointment_time"):
         state["new_appointment_time"] = extracted["new_appointment_time"]
         state["date_change_detected"] = True
-        logger.info(f"New appointment time extracted: {extracted['new_appointment_time']}")
+        logger.info("New appointment time extracted: %s", extracted['new_appointment_time'])
         print(f"✅ Dato extraído: new_appointment_time = '{extracted['new_appointment_time']}'")
 
     # Incidents
-    if extracted.get("incident_summary"):
-        incidents = state.get("incidents", [])
+    if (summary := extracted.get("incident_summary")):
+        incidents = state.get("incidents")
+        if incidents is None:
+            state["incidents"] = incidents = []
         incidents.append({
-            "summary": extracted["incident_summary"],
+            "summary": summary,
             "timestamp": state.get("_current_timestamp", "")
         })
-        state["incidents"] = incidents
-
-    # Special observations (for service modifications)
-    if extracted.get("special_observation"):
-        state["special_observation"] = extracted["special_observation"]
-        logger.info(f"Special observation extracted: {extracted['special_observation']}")
 
     # Update phase
     state["current_phase"] = state.get("next_phase", state.get("current_phase", "GREETING"))
@@ -174,6 +154,6 @@ def response_processor(state: Dict[str, Any]) -> Dict[str, Any]:
     if state["current_phase"] != prev_phase:
         state["validation_attempt_count"] = 0
 
-    logger.info(f"Extracted data updated. New phase: {state['current_phase']}")
+    logger.info("Extracted data updated. New phase: %s", state['current_phase'])
 
     return state
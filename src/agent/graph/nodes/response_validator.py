@@ -6,6 +6,7 @@ Dos capas de validación:
 2. Capa B (Fallback): Respuestas predefinidas para errores graves
 """
 import re
+import json
 import logging
 from typing import Dict, Any, Tuple, Optional
 
@@ -63,55 +64,52 @@ GRAVE_ERROR_PATTERNS = {
 }
 
 
-# =============================================================================
-# VALIDACIONES DE CONTEXTO (sin regex, lógica)
-# =============================================================================
-def _check_empathy_missing(response: str, needs_empathy: bool, emotion: str) -> Optional[str]:
-    """
-    Verifica si falta empatía cuando el usuario está molesto.
-
-    Returns:
-        Mensaje de advertencia si falta empatía, None si está OK
-    """
-    if not needs_empathy or emotion != "frustración":
-        return None
+# Patrones precompilados al importar el módulo.
+# Las correcciones se aplican en orden, una tras otra: algunas se solapan
+# ("este LUNES, LUNES") y el resultado depende de cuál corre primero.
+_COMPILED_CORRECTIONS = tuple(
+    (re.compile(pattern, re.IGNORECASE), replacement, error_type)
+    for pattern, replacement, error_type in REGEX_CORRECTIONS
+)
 
-    # Palabras que indican empatía
-    empathy_words = [
-        "entiendo", "lamento", "comprendo", "disculp",
-        "tiene razón", "es frustrante", "molestia"
-    ]
-
-    response_lower = response.lower()
-    has_empathy = any(word in response_lower for word in empathy_words)
-
-    if not has_empathy:
-        return "ADVERTENCIA: Usuario frustrado pero respuesta sin empatía"
-
-    return None
+_COMPILED_GRAVE_ERRORS = {
+    error_name: {**config, 'compiled': re.compile(config['pattern'], re.IGNORECASE)}
+    for error_name, config in GRAVE_ERROR_PATTERNS.items()
+}
 
+# Capa A solo puede corregir algo si aparece alguno de estos fragmentos
+# (comparados en minúsculas, igual que los patrones con IGNORECASE)
+_CAPA_A_HINTS = (
+    'sr', '/', 'soy maría',
+    'lunes', 'martes', 'miércoles', 'miercoles', 'jueves', 'viernes',
+    'sábado', 'sabado', 'domingo',
+)
+
+# Fragmento requerido por cada error grave para poder coincidir
+_GRAVE_ERROR_HINTS = {
+    'parentesco_como_nombre': 'sr',
+    'json_en_respuesta': '{',
+}
 
-def _check_policy_violation(response: str, relevant_policies: list) -> Optional[str]:
-    """
-    Verifica si la respuesta contradice alguna política.
+_JSON_AGENT_RE = re.compile(r'\{[^{}]*"agent_response"\s*:\s*"([^"]+)"[^{}]*\}')
 
-    Returns:
-        Mensaje de advertencia si hay violación, None si está OK
-    """
-    response_lower = response.lower()
 
-    # Verificaciones específicas
-    if "zona" in str(relevant_policies) or "cobertura" in str(relevant_policies):
-        # Si hay política de zona y el agente dice "sí podemos ir"
-        if "sí podemos" in response_lower or "no hay problema" in response_lower:
-            return "ADVERTENCIA: Posible violación de política de cobertura"
+# =============================================================================
+# VALIDACIONES DE CONTEXTO (solo advertencias)
+# =============================================================================
+# Palabras que indican empatía
+_EMPATHY_WORDS = (
+    "entiendo", "lamento", "comprendo", "disculp",
+    "tiene razón", "es frustrante", "molestia",
+)
 
-    if "conductor" in str(relevant_policies):
-        # Si hay política de conductor y el agente promete asignar uno específico
-        if "le asignaré" in response_lower or "voy a asignar" in response_lower:
-            return "ADVERTENCIA: No se puede prometer conductor específico"
+# Frases que contradicen políticas de cobertura / conductor
+_COVERAGE_PROMISES = ("sí podemos", "no hay problema")
+_DRIVER_PROMISES = ("le asignaré", "voy a asignar")
 
-    return None
+_EMPATHY_RE = re.compile('|'.join(map(re.escape, _EMPATHY_WORDS)))
+_COVERAGE_PROMISE_RE = re.compile('|'.join(map(re.escape, _COVERAGE_PROMISES)))
+_DRIVER_PROMISE_RE = re.compile('|'.join(map(re.escape, _DRIVER_PROMISES)))
 
 
 # =============================================================================
@@ -139,78 +137,88 @@ class ResponseValidator:
         was_corrected = False
         corrected_response = response
 
+        response_lower = corrected_response.lower()
+
         # Capa A: Correcciones Regex
-        for pattern, replacement, error_type in REGEX_CORRECTIONS:
-            if re.search(pattern, corrected_response, re.IGNORECASE):
-                corrected_response = re.sub(
-                    pattern,
-                    replacement,
-                    corrected_response,
-                    flags=re.IGNORECASE
-                )
-                corrections.append(f"REGEX_FIX: {error_type}")
-                was_corrected = True
-                logger.info(f"[VALIDATOR] Corregido: {error_type}")
+        # (se omite si la respuesta no contiene ningún fragmento sospechoso)
+        if any(hint in response_lower for hint in _CAPA_A_HINTS):
+            for compiled, replacement, error_type in _COMPILED_CORRECTIONS:
+                corrected_response, count = compiled.subn(replacement, corrected_response)
+                if count:
+                    corrections.append(f"REGEX_FIX: {error_type}")
+                    was_corrected = True
+                    logger.info("[VALIDATOR] Corregido: %s", error_type)
+            if was_corrected:
+                response_lower = corrected_response.lower()
 
         # Capa B: Detección de errores graves → Fallback
-        for error_name, config in GRAVE_ERROR_PATTERNS.items():
-            if re.search(config['pattern'], corrected_response, re.IGNORECASE):
+        for error_name, config in _COMPILED_GRAVE_ERRORS.items():
+            hint = _GRAVE_ERROR_HINTS.get(error_name)
+            if hint and hint not in response_lower:
+                continue
+            if config['compiled'].search(corrected_response):
                 if config['fallback']:
                     corrected_response = config['fallback']
+                    response_lower = corrected_response.lower()
                     corrections.append(f"FALLBACK: {error_name}")
                     was_corrected = True
-                    logger.warning(f"[VALIDATOR] Error grave, usando fallback: {error_name}")
+                    logger.warning("[VALIDATOR] Error grave, usando fallback: %s", error_name)
                 elif error_name == 'json_en_respuesta':
                     # Intentar extraer agent_response del JSON
                     extracted = self._extract_from_json(corrected_response)
                     if extracted:
                         corrected_response = extracted
+                        response_lower = corrected_response.lower()
                         corrections.append("EXTRACTED_FROM_JSON")
                         was_corrected = True
 
         # Validaciones de contexto (solo advertencias, no correcciones automáticas)
-        needs_empathy = state.get("needs_empathy", False)
-        emotion = state.get("user_emotion", "neutro")
-        policies = state.get("relevant_policies", [])
-
-        empathy_warning = _check_empathy_missing(corrected_response, needs_empathy, emotion)
-        if empathy_warning:
+        # Empatía: usuario frustrado y respuesta sin ninguna frase empática
+        if (state.get("needs_empathy", False)
+                and state.get("user_emotion", "neutro") == "frustración"
+                and not _EMPATHY_RE.search(response_lower)):
+            empathy_warning = "ADVERTENCIA: Usuario frustrado pero respuesta sin empatía"
             corrections.append(empathy_warning)
-            logger.warning(f"[VALIDATOR] {empathy_warning}")
-
-        policy_warning = _check_policy_violation(corrected_response, policies)
+            logger.warning("[VALIDATOR] %s", empathy_warning)
+
+        # Políticas: la respuesta promete algo que la política detectada prohíbe
+        policy_keywords = frozenset(state.get("policy_keywords", ()))
+        policy_warning = None
+        if "zona_cobertura" in policy_keywords and _COVERAGE_PROMISE_RE.search(response_lower):
+            policy_warning = "ADVERTENCIA: Posible violación de política de cobertura"
+        elif "conductor" in policy_keywords and _DRIVER_PROMISE_RE.search(response_lower):
+            policy_warning = "ADVERTENCIA: No se puede prometer conductor específico"
         if policy_warning:
             corrections.append(policy_warning)
-            logger.warning(f"[VALIDATOR] {policy_warning}")
+            logger.warning("[VALIDATOR] %s", policy_warning)
 
         return corrected_response, was_corrected, corrections
 
     def _extract_from_json(self, text: str) -> Optional[str]:
         """Intenta extraer agent_response de un JSON mal formateado."""
-        import json
-        try:
-            # Buscar el JSON en el texto
-            match = re.search(r'\{[^{}]*"agent_response"\s*:\s*"([^"]+)"[^{}]*\}', text)
-            if match:
-                return match.group(1)
+        if '{' not in text:
+            return None
 
-            # Intentar parsear como JSON completo
+        # Buscar el JSON en el texto
+        match = _JSON_AGENT_RE.search(text)
+        if match:
+            return match.group(1)
+
+        # Intentar parsear como JSON completo
+        try:
             data = json.loads(text)
-            if isinstance(data, dict) and "agent_response" in data:
-                return data["agent_response"]
-        except:
-            pass
+        except (ValueError, TypeError):
+            return None
+        if isinstance(data, dict) and "agent_response" in data:
+            return data["agent_response"]
         return None
 
 
-# Singleton
-_validator_instance = None
+# Singleton (sin estado, se crea al importar)
+_validator_instance = ResponseValidator()
 
 
 def get_response_validator() -> ResponseValidator:
-    global _validator_instance
-    if _validator_instance is None:
-        _validator_instance = ResponseValidator()
     return _validator_instance
 
 
@@ -226,8 +234,7 @@ def response_validator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     if not response:
         return state
 
-    validator = get_response_validator()
-    corrected, was_corrected, corrections = validator.validate_and_correct(
+    corrected, was_corrected, corrections = _validator_instance.validate_and_correct(
         response=response,
         state=state
     )
@@ -237,6 +244,6 @@ def response_validator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     state["response_was_corrected"] = was_corrected
 
     if was_corrected:
-        logger.info(f"[VALIDATOR] Respuesta corregida. Correcciones: {corrections}")
+        logger.info("[VALIDATOR] Respuesta corregida. Correcciones: %s", corrections)
 
     return state
@@ -4,9 +4,22 @@ Simple Analyzer - Análisis basado en reglas (sin LLM).
 Reemplaza el pre_analyzer LLM por un análisis rápido basado en patrones.
 Reduce la latencia de ~2 segundos a <10ms.
 """
+import os
 import re
+import time
+import logging
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, Any, List
 
+logger = logging.getLogger(__name__)
+
+# Banners por stdout solo para depuración local (SIMPLE_ANALYZER_DEBUG=1)
+_DEBUG = os.getenv("SIMPLE_ANALYZER_DEBUG") == "1"
+
+# Un mensaje de usuario más atrás de esta ventana nunca es "el último"
+_LAST_MESSAGE_WINDOW = 10
+
 # Patrones de emoción
 EMOTION_PATTERNS = {
     "frustración": [
@@ -90,79 +103,122 @@ POLICY_KEYWORDS_PATTERNS = {
     "menor_edad": [r"\b(soy el hijo|soy la hija|tengo \d+ años|menor)\b"],
 }
 
+# Resultado cuando no hay mensaje del usuario (policy_keywords se agrega aparte)
+_DEFAULT_ANALYSIS = {
+    "user_emotion": "neutro",
+    "user_emotion_level": "bajo",
+    "user_intent": "otro",
+    "user_topic": "otro",
+    "needs_empathy": False,
+}
+
+
+def _fuse_patterns(patterns_by_category: Dict[str, List[str]]):
+    """
+    Compila todas las categorías en una sola alternancia con grupos nombrados.
+
+    Cada alternativa va dentro de un lookahead para que finditer pruebe todas
+    las posiciones (las coincidencias pueden solaparse entre categorías).
+    Ante dos alternativas en la misma posición gana la primera, que respeta
+    el orden de prioridad del dict.
+
+    Returns:
+        Tuple de (patrón compilado, {nombre_grupo: categoría})
+    """
+    parts = []
+    group_category = {}
+    for category, patterns in patterns_by_category.items():
+        for pattern in patterns:
+            name = f"_g{len(group_category)}"
+            group_category[name] = category
+            parts.append(f"(?P<{name}>{pattern})")
+    fused = re.compile(f"(?=(?:{'|'.join(parts)}))", re.IGNORECASE)
+    return fused, group_category
+
+
+def _matched_categories(fused: re.Pattern, group_category: Dict[str, str], text: str) -> set:
+    """Categorías con al menos una coincidencia en `text`, en un solo recorrido."""
+    return {group_category[m.lastgroup] for m in fused.finditer(text)}
+
+
+_EMOTION_RE, _EMOTION_GROUPS = _fuse_patterns(EMOTION_PATTERNS)
+_INTENT_RE, _INTENT_GROUPS = _fuse_patterns(INTENT_PATTERNS)
+_TOPIC_RE, _TOPIC_GROUPS = _fuse_patterns(TOPIC_PATTERNS)
+_POLICY_RE, _POLICY_GROUPS = _fuse_patterns(POLICY_KEYWORDS_PATTERNS)
+
 
 def analyze_message(message: str) -> Dict[str, Any]:
     """
     Analiza un mensaje usando patrones regex.
 
-    Retorna el mismo formato que el pre_analyzer LLM pero sin latencia.
+    Las claves coinciden con las del state, así el nodo puede fusionar el
+    resultado directamente con state.update().
 
     Args:
         message: Mensaje del usuario
 
     Returns:
-        Dict con: emotion, emotion_level, intent, topic, needs_empathy, policy_keywords
+        Dict con: user_emotion, user_emotion_level, user_intent, user_topic,
+        needs_empathy, policy_keywords
     """
-    msg_lower = message.lower().strip()
+    analysis = _analyze_normalized(message.lower().strip())
+    # Copia: el resultado memoizado se comparte entre llamadas
+    return {**analysis, "policy_keywords": list(analysis["policy_keywords"])}
 
+
+@lru_cache(maxsize=1024)
+def _analyze_normalized(msg_lower: str) -> Dict[str, Any]:
+    """
+    Análisis puro sobre el mensaje ya normalizado, memoizado por contenido.
+
+    Mensajes cortos como "sí", "no" o "gracias" se repiten mucho entre
+    llamadas; las repeticiones no vuelven a ejecutar ningún patrón.
+    policy_keywords se devuelve como tuple para que el valor cacheado
+    no se pueda modificar.
+    """
     # Detectar emoción
     emotion = "neutro"
     emotion_level = "bajo"
 
-    for emo, patterns in EMOTION_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, msg_lower, re.IGNORECASE):
-                emotion = emo
-                # Determinar nivel
-                matches = sum(1 for p in patterns if re.search(p, msg_lower, re.IGNORECASE))
-                if matches >= 3:
-                    emotion_level = "alto"
-                elif matches >= 2:
-                    emotion_level = "medio"
-                else:
-                    emotion_level = "bajo"
-                break
-        if emotion != "neutro":
-            break
+    # Una alternancia fusionada por tabla, un recorrido cada una
+    intents_found = _matched_categories(_INTENT_RE, _INTENT_GROUPS, msg_lower)
+    topics_found = _matched_categories(_TOPIC_RE, _TOPIC_GROUPS, msg_lower)
+    keywords_found = _matched_categories(_POLICY_RE, _POLICY_GROUPS, msg_lower)
 
-    # Detectar intención
-    intent = "otro"
-    for int_name, patterns in INTENT_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, msg_lower, re.IGNORECASE):
-                intent = int_name
-                break
-        if intent != "otro":
-            break
+    # Un solo recorrido: cuántos patrones distintos de cada emoción
+    # coinciden (repetir la misma palabra no sube el nivel)
+    emo_counts = dict.fromkeys(EMOTION_PATTERNS, 0)
+    for group in {m.lastgroup for m in _EMOTION_RE.finditer(msg_lower)}:
+        emo_counts[_EMOTION_GROUPS[group]] += 1
+
+    # Gana la primera emoción, en orden del dict, con alguna coincidencia
+    emotion = next((name for name in EMOTION_PATTERNS if emo_counts[name]), emotion)
+    matches = emo_counts.get(emotion, 0)
+    # Determinar nivel
+    if matches >= 3:
+        emotion_level = "alto"
+    elif matches >= 2:
+        emotion_level = "medio"
+
+    # Detectar intención (gana la primera categoría en orden de prioridad)
+    intent = next((name for name in INTENT_PATTERNS if name in intents_found), "otro")
 
     # Detectar tópico
-    topic = "otro"
-    for top_name, patterns in TOPIC_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, msg_lower, re.IGNORECASE):
-                topic = top_name
-                break
-        if topic != "otro":
-            break
+    topic = next((name for name in TOPIC_PATTERNS if name in topics_found), "otro")
 
     # Detectar keywords de política
-    policy_keywords = []
-    for keyword, patterns in POLICY_KEYWORDS_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, msg_lower, re.IGNORECASE):
-                policy_keywords.append(keyword)
-                break
+    policy_keywords = [keyword for keyword in POLICY_KEYWORDS_PATTERNS if keyword in keywords_found]
 
     # Determinar si necesita empatía
     needs_empathy = emotion in ["frustración", "confusión"] and emotion_level in ["medio", "alto"]
 
     return {
-        "emotion": emotion,
-        "emotion_level": emotion_level,
-        "intent": intent,
-        "topic": topic,
+        "user_emotion": emotion,
+        "user_emotion_level": emotion_level,
+        "user_intent": intent,
+        "user_topic": topic,
         "needs_empathy": needs_empathy,
-        "policy_keywords": policy_keywords,
+        "policy_keywords": tuple(policy_keywords),
     }
 
 
@@ -173,62 +229,52 @@ def simple_analyzer_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Reemplaza pre_analyzer_node pero sin llamada LLM.
     Latencia: <10ms en lugar de ~2000ms.
     """
-    import time
-    import logging
-    logger = logging.getLogger(__name__)
-
     start_time = time.perf_counter()
 
-    print("\n" + "="*60)
-    print("⚡ [SIMPLE_ANALYZER] ANÁLISIS RÁPIDO (sin LLM)")
-    print("="*60)
+    if _DEBUG:
+        print("\n" + "="*60)
+        print("⚡ [SIMPLE_ANALYZER] ANÁLISIS RÁPIDO (sin LLM)")
+        print("="*60)
 
-    # Obtener último mensaje del usuario
+    # Obtener último mensaje del usuario (solo los más recientes)
     messages = state.get("messages", [])
     last_message = ""
-    for msg in reversed(messages):
-        if isinstance(msg, dict) and msg.get("role") == "user":
-            last_message = msg.get("content", "")
-            break
-        elif hasattr(msg, "type") and msg.type == "human":
+    for msg in islice(reversed(messages), _LAST_MESSAGE_WINDOW):
+        if getattr(msg, "type", None) == "human":
             last_message = msg.content
             break
 
     if not last_message:
         # Sin mensaje, valores por defecto
-        state["user_emotion"] = "neutro"
-        state["user_emotion_level"] = "bajo"
-        state["user_intent"] = "otro"
-        state["user_topic"] = "otro"
-        state["needs_empathy"] = False
-        state["policy_keywords"] = []
-        print("   (sin mensaje de usuario)")
-        print("="*60 + "\n")
+        state.update(_DEFAULT_ANALYSIS, policy_keywords=[])
+        if _DEBUG:
+            print("   (sin mensaje de usuario)")
+            print("="*60 + "\n")
         return state
 
     # Analizar con reglas
     analysis = analyze_message(last_message)
 
     # Agregar al state
-    state["user_emotion"] = analysis["emotion"]
-    state["user_emotion_level"] = analysis["emotion_level"]
-    state["user_intent"] = analysis["intent"]
-    state["user_topic"] = analysis["topic"]
-    state["needs_empathy"] = analysis["needs_empathy"]
-    state["policy_keywords"] = analysis["policy_keywords"]
+    state.update(analysis)
 
     # Calcular tiempo
     elapsed_ms = (time.perf_counter() - start_time) * 1000
 
-    logger.info(f"[SIMPLE_ANALYZER] {analysis['emotion']}({analysis['emotion_level']}) | {analysis['intent']} | {analysis['topic']} | {elapsed_ms:.1f}ms")
+    logger.info(
+        "[SIMPLE_ANALYZER] emotion=%s level=%s intent=%s topic=%s empathy=%s keywords=%s elapsed_ms=%.1f",
+        analysis["user_emotion"], analysis["user_emotion_level"], analysis["user_intent"], analysis["user_topic"],
+        analysis["needs_empathy"], analysis["policy_keywords"], elapsed_ms,
+    )
 
-    print(f"\n📊 [SIMPLE_ANALYZER] RESULTADO:")
-    print(f"   • Emoción: {analysis['emotion']} ({analysis['emotion_level']})")
-    print(f"   • Intent: {analysis['intent']}")
-    print(f"   • Topic: {analysis['topic']}")
-    print(f"   • Needs empathy: {analysis['needs_empathy']}")
-    print(f"   • Policy keywords: {analysis['policy_keywords']}")
-    print(f"   ⏱️  Tiempo: {elapsed_ms:.1f}ms (antes ~2000ms con LLM)")
-    print("="*60 + "\n")
+    if _DEBUG:
+        print(f"\n📊 [SIMPLE_ANALYZER] RESULTADO:")
+        print(f"   • Emoción: {analysis['user_emotion']} ({analysis['user_emotion_level']})")
+        print(f"   • Intent: {analysis['user_intent']}")
+        print(f"   • Topic: {analysis['user_topic']}")
+        print(f"   • Needs empathy: {analysis['needs_empathy']}")
+        print(f"   • Policy keywords: {analysis['policy_keywords']}")
+        print(f"   ⏱️  Tiempo: {elapsed_ms:.1f}ms (antes ~2000ms con LLM)")
+        print("="*60 + "\n")
 
     return state
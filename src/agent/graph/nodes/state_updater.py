@@ -1,6 +1,6 @@
 # State updater node
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 
 def state_updater(state: Dict[str, Any]) -> Dict[str, Any]:
     """Update state after LLM response"""
@@ -9,6 +9,6 @@ def state_updater(state: Dict[str, Any]) -> Dict[str, Any]:
         state['current_phase'] = state['next_phase']
     
     # Update timestamp
-    state['updated_at'] = datetime.utcnow().isoformat()
+    state['updated_at'] = state.get('_current_timestamp') or datetime.now(timezone.utc).isoformat(timespec='milliseconds')
     
     return state
@@ -0,0 +1,8 @@
+# Turn start node - stamp the turn once for every downstream node
+from typing import Dict, Any
+from datetime import datetime, timezone
+
+def turn_start(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the turn timestamp so later nodes reuse it instead of calling datetime.now()"""
+    state['_current_timestamp'] = datetime.now(timezone.utc).isoformat()
+    return state
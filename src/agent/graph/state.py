@@ -107,6 +107,9 @@ class ConversationState(TypedDict):
     
     policy_violations: List[Dict[str, Any]]
     """List of detected policy violations with details"""
+
+    policy_ids: List[str]
+    """IDs of the detected policy violations (precomputed for logging)"""
     
     policy_context_injected: str
     """Policy context text injected into prompt"""
@@ -127,11 +130,13 @@ class ConversationState(TypedDict):
     # ========== Incidencias ==========
     incidents: List[Dict[str, Any]]
     """
-    Structured incidents list. Each incident has:
-    - type: str (IMPUNTUALIDAD, CONDUCTOR_ROTACION, etc.)
-    - severity: str (LOW, MEDIUM, HIGH)
-    - description: str
-    - timestamp: str (ISO 8601)
+    Incidents reported during the call (appended by response_processor).
+    Each incident has:
+    - summary: str (incident_summary extracted by the LLM)
+    - timestamp: str (ISO 8601, turn timestamp)
+
+    Entries stay plain dicts: they are returned as JSON objects by the API
+    and persisted as-is to Redis.
     """
     
     # ========== Confirmación (outbound) ==========
@@ -264,6 +269,20 @@ class ConversationState(TypedDict):
     
     updated_at: str
     """Last update timestamp (ISO 8601)"""
+
+    _current_timestamp: str
+    """Timestamp of the current turn (ISO 8601), set once by turn_start"""
     
     excel_row_index: Optional[int]
     """Row index in Excel file (for outbound calls)"""
+
+
+def last_human_content(messages: List[BaseMessage]) -> str:
+    """Return the content of the most recent user message ("" if there is none)."""
+    # Walk by index from the end: no reverse iterator, and getattr with a
+    # default instead of hasattr + attribute access
+    for i in range(len(messages) - 1, -1, -1):
+        msg = messages[i]
+        if getattr(msg, "type", None) == "human":
+            return msg.content
+    return ""
@@ -5,12 +5,25 @@ These adapters handle the conversion between the TypedDict state and JSON
 for Redis storage, including special handling for LangChain message objects.
 """
 
-from typing import Dict, Any
-from datetime import datetime
+import sys
+import time
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from src.agent.graph.state import ConversationState
 
 
+# Dispatch tables for message (de)serialization
+_SER_ROLE = {HumanMessage: "human", AIMessage: "ai", SystemMessage: "system"}
+_DESER = {"HumanMessage": HumanMessage, "AIMessage": AIMessage, "SystemMessage": SystemMessage}
+# Legacy entries without "type" (role only, as the orchestrator used to save them)
+_DESER_ROLE = {
+    "human": HumanMessage, "user": HumanMessage,
+    "ai": AIMessage, "assistant": AIMessage,
+    "system": SystemMessage,
+}
+
+
 def serialize_message(message: BaseMessage) -> Dict[str, Any]:
     """
     Serialize a LangChain message to a dictionary.
@@ -21,16 +34,24 @@ def serialize_message(message: BaseMessage) -> Dict[str, Any]:
     Returns:
         Dictionary representation of the message
     """
+    cls = message.__class__
+    name = cls.__name__
+    role = _SER_ROLE.get(cls)
+    if role is None:
+        role = name.replace("Message", "").lower()
     return {
-        "role": message.__class__.__name__.replace("Message", "").lower(),
+        "role": role,
         "content": message.content,
-        "type": message.__class__.__name__
+        "type": name
     }
 
 
 def deserialize_message(message_dict: Dict[str, Any]) -> BaseMessage:
     """
     Deserialize a dictionary to a LangChain message.
+
+    Entries without a type fall back to their role; unknown types default
+    to HumanMessage.
     
     Args:
         message_dict: Dictionary with message data
@@ -38,23 +59,18 @@ def deserialize_message(message_dict: Dict[str, Any]) -> BaseMessage:
     Returns:
         LangChain BaseMessage object
     """
-    message_type = message_dict.get("type", "HumanMessage")
-    content = message_dict.get("content", "")
-    
-    if message_type == "HumanMessage":
-        return HumanMessage(content=content)
-    elif message_type == "AIMessage":
-        return AIMessage(content=content)
-    elif message_type == "SystemMessage":
-        return SystemMessage(content=content)
-    else:
-        # Default to HumanMessage
-        return HumanMessage(content=content)
+    message_cls = _DESER.get(message_dict.get("type"))
+    if message_cls is None:
+        message_cls = _DESER_ROLE.get(message_dict.get("role"), HumanMessage)
+    return message_cls(content=message_dict.get("content", ""))
 
 
 def state_to_dict(state: ConversationState) -> Dict[str, Any]:
     """
     Convert ConversationState to a JSON-serializable dictionary.
+
+    Without messages the state is already serializable and is returned
+    as-is (no copy); callers must treat the result as read-only.
     
     Args:
         state: ConversationState TypedDict
@@ -62,15 +78,81 @@ def state_to_dict(state: ConversationState) -> Dict[str, Any]:
     Returns:
         Dictionary that can be serialized to JSON for Redis
     """
-    serialized = dict(state)
-    
-    # Serialize messages
-    if "messages" in serialized and serialized["messages"]:
-        serialized["messages"] = [
-            serialize_message(msg) for msg in serialized["messages"]
-        ]
-    
-    return serialized
+    messages = state.get("messages")
+    if not messages:
+        return state
+
+    return {**state, "messages": list(map(serialize_message, messages))}
+
+
+def state_to_dict_incremental(
+    state: ConversationState,
+    previous: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Convert ConversationState to a dictionary, reusing a previous snapshot.
+
+    Messages are append-only within a session, so the already serialized
+    prefix from the previous snapshot is reused and only the new tail is
+    serialized. The result is always a new dict, safe to keep as the next
+    snapshot.
+
+    Args:
+        state: ConversationState TypedDict
+        previous: Last dictionary produced for the same session (optional)
+
+    Returns:
+        Dictionary that can be serialized to JSON for Redis
+    """
+    messages = state.get("messages") or []
+    cached_messages = (previous.get("messages") or []) if previous else []
+    if len(messages) < len(cached_messages):
+        # History was reset/replaced: serialize from scratch
+        cached_messages = []
+
+    return {
+        **state,
+        "messages": cached_messages + list(
+            map(serialize_message, messages[len(cached_messages):])
+        ),
+    }
+
+
+def state_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fields of a serialized state that changed since a previous snapshot.
+
+    Scalars are compared by value. Lists and dicts are always included: nodes
+    mutate them in place (e.g. incidents), so the previous snapshot may share
+    the very same object. Messages are excluded (they are appended separately).
+
+    Args:
+        previous: Snapshot last written for the session
+        current: New snapshot
+
+    Returns:
+        Dictionary with only the fields to rewrite
+    """
+    delta = {}
+    for field, value in current.items():
+        if field == "messages":
+            continue
+        if isinstance(value, (list, dict)) or field not in previous or previous[field] != value:
+            delta[field] = value
+    return delta
+
+
+# Fields drawn from small closed sets; interned so sessions share one str per value
+_ENUM_FIELDS = (
+    "current_phase", "next_phase", "call_direction", "service_type", "document_type",
+    "user_emotion", "user_emotion_level", "user_intent", "user_topic",
+    "personality_mode", "current_sentiment", "current_conflict_level", "route_type",
+)
+
+
+def _i(value):
+    """Intern a string value (other values are returned unchanged)."""
+    return sys.intern(value) if isinstance(value, str) and value else value
 
 
 def dict_to_state(data: Dict[str, Any]) -> ConversationState:
@@ -84,14 +166,154 @@ def dict_to_state(data: Dict[str, Any]) -> ConversationState:
         ConversationState TypedDict
     """
     # Deserialize messages
-    if "messages" in data and data["messages"]:
-        data["messages"] = [
-            deserialize_message(msg_dict) for msg_dict in data["messages"]
-        ]
+    messages = data.get("messages")
+    if messages:
+        data["messages"] = list(map(deserialize_message, messages))
+
+    for field in _ENUM_FIELDS:
+        if field in data:
+            data[field] = _i(data[field])
     
     return data  # type: ignore
 
 
+# Default values for a new session. create_initial_state copies this and
+# patches the per-session fields; list fields always get a fresh list.
+_INITIAL_STATE_TEMPLATE: Dict[str, Any] = {
+    # Identificación
+    "session_id": "",
+    "call_direction": "INBOUND",
+    "current_phase": "GREETING",
+    "llm_system_prompt": "",
+    "agent_name": "María",
+    "company_name": "Transpormax",
+    "eps_name": "Cosalud",
+    
+    # Mensajes
+    "messages": [],
+    
+    # Datos del paciente
+    "patient_full_name": None,
+    "document_type": None,
+    "document_number": None,
+    "eps": None,
+    "phone": None,
+    "relationship_to_patient": None,
+    "caller_name": None,
+
+    # Contact data (for outbound calls)
+    "contact_name": None,
+    "contact_relationship": None,
+    "contact_age": None,
+    
+    # Datos del servicio
+    "service_type": None,
+    "treatment_type": None,
+    "appointment_dates": [],
+    "appointment_date": None,
+    "appointment_time": None,
+    "pickup_time": None,
+    "pickup_time_adjustment": None,
+    "pickup_address": None,
+    "frequency": None,
+    "route_type": None,
+    
+    # Políticas
+    "active_policies": [],
+    "policy_violations": [],
+    "policy_ids": [],
+    "policy_context_injected": "",
+    
+    # Validaciones pre-LLM
+    "eligibility_checked": False,
+    "eligibility_issues": [],
+    "escalation_required": False,
+    "escalation_reasons": [],
+    
+    # Incidencias
+    "incidents": [],
+    
+    # Confirmación (outbound)
+    "confirmation_status": None,
+    "service_confirmed": False,
+    "date_change_detected": False,
+    "new_appointment_date": None,
+    "new_appointment_time": None,
+    "rejection_reason": None,
+    
+    # Casos especiales
+    "special_needs": [],
+    "coverage_issue": False,
+    "patient_away": False,
+    "patient_return_date": None,
+    "wrong_number": False,
+    "patient_deceased": False,
+    "language_barrier": False,
+    
+    # Observaciones
+    "observations": [],
+    "special_observation": None,
+
+    # Análisis Emocional (Integración Ligera)
+    "emotional_memory": [],
+    "current_sentiment": "Neutro",
+    "current_conflict_level": "Bajo",
+    "personality_mode": "Balanceado",
+    "emotional_validation_required": False,
+    "validation_attempt_count": 0,
+
+    # Supervisor Robusto (Pre-Analyzer + Context Enricher)
+    "user_emotion": "neutro",
+    "user_emotion_level": "bajo",
+    "user_intent": "otro",
+    "user_topic": "otro",
+    "needs_empathy": False,
+    "policy_keywords": [],
+    "relevant_policies": [],
+    "case_example": None,
+    "tone_instruction": "",
+
+    # Control de flujo
+    "agent_response": "",
+    "next_phase": None,
+    "turn_count": 0,
+    "requires_human_review": False,
+    "greeting_done": False,
+
+    # Metadata
+    "created_at": "",
+    "updated_at": "",
+    "_current_timestamp": "",
+    "excel_row_index": None
+}
+
+_LIST_FIELDS = tuple(key for key, value in _INITIAL_STATE_TEMPLATE.items() if isinstance(value, list))
+
+# Initial phase by call direction (anything else starts as an inbound call)
+_INITIAL_PHASE = {
+    "OUTBOUND": sys.intern("OUTBOUND_GREETING"),
+    "INBOUND": sys.intern("GREETING"),
+}
+
+# (millisecond tick, formatted ISO timestamp) of the last session created.
+# One immutable tuple, read once and replaced whole: sessions are also created
+# from worker threads, which must never pair a new tick with an old string
+_ts_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """UTC ISO timestamp, formatted at most once per millisecond."""
+    global _ts_cache
+    t = time.time()
+    tick = int(t * 1000)
+    cached_tick, cached_iso = _ts_cache
+    if tick == cached_tick:
+        return cached_iso
+    iso = datetime.fromtimestamp(t, timezone.utc).isoformat()
+    _ts_cache = (tick, iso)
+    return iso
+
+
 def create_initial_state(
     session_id: str,
     call_direction: str,
@@ -114,116 +336,21 @@ def create_initial_state(
     Returns:
         Initialized ConversationState
     """
-    now = datetime.utcnow().isoformat()
+    now = _now_iso()
     
-    # Determine initial phase based on call direction
-    if call_direction == "OUTBOUND":
-        initial_phase = "OUTBOUND_GREETING"
-    else:
-        initial_phase = "GREETING"
-    
-    return {
-        # Identificación
-        "session_id": session_id,
-        "call_direction": call_direction,
-        "current_phase": initial_phase,
-        "llm_system_prompt": "",
-        "agent_name": agent_name,
-        "company_name": company_name,
-        "eps_name": eps_name,
-        
-        # Mensajes
-        "messages": [],
-        
-        # Datos del paciente
-        "patient_full_name": None,
-        "document_type": None,
-        "document_number": None,
-        "eps": None,
-        "phone": None,
-        "relationship_to_patient": None,
-        "caller_name": None,
-
-        # Contact data (for outbound calls)
-        "contact_name": None,
-        "contact_relationship": None,
-        "contact_age": None,
-        
-        # Datos del servicio
-        "service_type": None,
-        "treatment_type": None,
-        "appointment_dates": [],
-        "appointment_date": None,
-        "appointment_time": None,
-        "pickup_time": None,
-        "pickup_time_adjustment": None,
-        "pickup_address": None,
-        "frequency": None,
-        "route_type": None,
-        
-        # Políticas
-        "active_policies": [],
-        "policy_violations": [],
-        "policy_context_injected": "",
-        
-        # Validaciones pre-LLM
-        "eligibility_checked": False,
-        "eligibility_issues": [],
-        "escalation_required": False,
-        "escalation_reasons": [],
-        
-        # Incidencias
-        "incidents": [],
-        
-        # Confirmación (outbound)
-        "confirmation_status": None,
-        "service_confirmed": False,
-        "date_change_detected": False,
-        "new_appointment_date": None,
-        "new_appointment_time": None,
-        "rejection_reason": None,
-        
-        # Casos especiales
-        "special_needs": [],
-        "coverage_issue": False,
-        "patient_away": False,
-        "patient_return_date": None,
-        "wrong_number": False,
-        "patient_deceased": False,
-        "language_barrier": False,
-        
-        # Observaciones
-        "observations": [],
-        "special_observation": None,
-
-        # Análisis Emocional (Integración Ligera)
-        "emotional_memory": [],
-        "current_sentiment": "Neutro",
-        "current_conflict_level": "Bajo",
-        "personality_mode": "Balanceado",
-        "emotional_validation_required": False,
-        "validation_attempt_count": 0,
-
-        # Supervisor Robusto (Pre-Analyzer + Context Enricher)
-        "user_emotion": "neutro",
-        "user_emotion_level": "bajo",
-        "user_intent": "otro",
-        "user_topic": "otro",
-        "needs_empathy": False,
-        "policy_keywords": [],
-        "relevant_policies": [],
-        "case_example": None,
-        "tone_instruction": "",
-
-        # Control de flujo
-        "agent_response": "",
-        "next_phase": None,
-        "turn_count": 0,
-        "requires_human_review": False,
-        "greeting_done": False,
-
-        # Metadata
-        "created_at": now,
-        "updated_at": now,
-        "excel_row_index": excel_row_index
-    }
+    state = _INITIAL_STATE_TEMPLATE.copy()
+    for field in _LIST_FIELDS:
+        state[field] = []
+
+    state["session_id"] = session_id
+    state["call_direction"] = _i(call_direction)
+    state["current_phase"] = _INITIAL_PHASE.get(call_direction, "GREETING")
+    state["agent_name"] = agent_name
+    state["company_name"] = company_name
+    state["eps_name"] = eps_name
+    state["created_at"] = now
+    state["updated_at"] = now
+    state["_current_timestamp"] = now
+    state["excel_row_index"] = excel_row_index
+
+    return state  # type: ignore
@@ -1,13 +1,24 @@
 # LangGraph Orchestrator - compatible with CallOrchestrator interface
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional
+import asyncio
+import os
 import uuid
 import logging
+import threading
+from functools import lru_cache
+from cachetools import TTLCache
 from langchain_core.messages import HumanMessage, AIMessage
 from src.agent.graph.conversation_graph import create_conversation_graph
-from src.agent.graph.state_adapters import create_initial_state, state_to_dict
+from src.agent.graph.state_adapters import (
+    create_initial_state,
+    dict_to_state,
+    state_delta,
+    state_to_dict_incremental,
+)
+from src.domain.value_objects.conversation_phase import ConversationPhase
 from src.infrastructure.logging import get_logger
 from src.infrastructure.config.settings import settings as app_settings
-from src.infrastructure.observability import get_langfuse_handler, get_langfuse_client
+from src.infrastructure.observability import get_langfuse_handler, get_langfuse_client, is_langfuse_enabled
 from src.infrastructure.observability.langfuse_integration import flush_langfuse
 
 logger = logging.getLogger(__name__)
@@ -15,6 +26,7 @@ logger = logging.getLogger(__name__)
 conv_logger = get_logger().logger
 
 
+@lru_cache(maxsize=1024)
 def _calculate_pickup_time(appointment_time: str, offset_minutes: int = 60) -> str:
     """
     Calculate pickup time based on appointment time.
@@ -29,31 +41,86 @@ def _calculate_pickup_time(appointment_time: str, offset_minutes: int = 60) -> s
         Pickup time in HH:MM format
     """
     try:
-        # Parse appointment time (handle both HH:MM and H:MM formats)
-        time_parts = appointment_time.replace('.', ':').split(':')
-        hour = int(time_parts[0])
-        minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+        # Parse appointment time (handle HH:MM, H:MM, H.MM, HH:MM:SS and H formats)
+        hour, _, rest = appointment_time.replace('.', ':').partition(':')
+        minute = rest[:2]
 
         # Calculate pickup time
-        total_minutes = hour * 60 + minute - offset_minutes
+        total_minutes = int(hour) * 60 + (int(minute) if minute else 0) - offset_minutes
 
         # Handle negative time (would be previous day)
         if total_minutes < 0:
             total_minutes = 0
-            logger.warning(f"Pickup time would be negative, setting to 00:00")
-
-        pickup_hour = total_minutes // 60
-        pickup_minute = total_minutes % 60
+            logger.warning("Pickup time would be negative, setting to 00:00")
 
+        pickup_hour, pickup_minute = divmod(total_minutes, 60)
         return f"{pickup_hour:02d}:{pickup_minute:02d}"
 
     except Exception as e:
-        logger.error(f"Error calculating pickup time from '{appointment_time}': {e}")
+        logger.error("Error calculating pickup time from '%s': %s", appointment_time, e)
         return appointment_time  # Return original if error
 
+# Messages that open an outbound call (answered with the scripted greeting, no LLM)
+_OUTBOUND_START_TOKENS = frozenset({"START", "INICIO", "COMENZAR", "/START"})
+
+# create_session default for patient_data: look the patient up in Excel itself
+_NOT_LOADED = object()
+
+# Capacity of the phone -> session index, as a multiple of MAX_ACTIVE_SESSIONS
+_PHONE_MAP_SIZE_FACTOR = 4
+
+# Langfuse tags per call direction and phase (precomputed; other values are formatted)
+_DIRECTION_TAGS = {"INBOUND": "inbound", "OUTBOUND": "outbound"}
+_PHASE_TAGS = {phase.value: f"phase:{phase.value}" for phase in ConversationPhase}
+
+
+@lru_cache(maxsize=64)
+def _service_tag(service_type: str) -> str:
+    return f"service:{service_type}"
+
+# Background observability work (strong references so tasks are not GC'd mid-flight)
+_background_tasks: set = set()
+
+# Result fields read by _record_langfuse_scores (snapshotted before going to a thread)
+_SCORED_KEYS = ("escalation_required", "next_phase", "current_phase", "extracted_data")
+
+
+def _run_in_background(func, *args) -> None:
+    """Run a blocking call in a worker thread without awaiting it."""
+    task = asyncio.create_task(asyncio.to_thread(func, *args))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _build_langfuse_handler(session_id: str, state: Dict[str, Any], call_direction: str, agent_name: str):
+    """Create the per-turn Langfuse handler, tagged with direction, phase and service."""
+    service_type = state.get("service_type")
+    phase = state.get('current_phase', 'GREETING')
+    langfuse_tags = [
+        _DIRECTION_TAGS.get(call_direction) or call_direction.lower(),
+        _PHASE_TAGS.get(phase) or f"phase:{phase}",
+    ]
+    if service_type:
+        langfuse_tags.append(_service_tag(service_type))
+
+    return get_langfuse_handler(
+        session_id=session_id,
+        user_id=state.get("patient_phone", "unknown"),
+        tags=langfuse_tags,
+        metadata={
+            "agent_name": agent_name,
+            "turn_count": state.get("turn_count", 0),
+            "call_direction": call_direction,
+            "patient_full_name": state.get("patient_full_name", ""),
+            "service_type": service_type or "",
+        },
+        trace_name="conversation_turn",
+    )
+
+
 def _record_langfuse_scores(handler, prev_phase: str, result: Dict[str, Any]):
     """Record custom scores in Langfuse after each conversation turn."""
-    if not handler:
+    if not handler or not is_langfuse_enabled():
         return
     try:
         client = get_langfuse_client()
@@ -66,39 +133,132 @@ def _record_langfuse_scores(handler, prev_phase: str, result: Dict[str, Any]):
         if not trace_id:
             return
 
-        # Score: escalation triggered
-        client.score(
-            trace_id=trace_id,
-            name="escalation_triggered",
-            value=1 if result.get("escalation_required") else 0,
-        )
-
-        # Score: phase transition occurred
         next_phase = result.get("next_phase") or result.get("current_phase")
         phase_changed = next_phase != prev_phase
-        client.score(
-            trace_id=trace_id,
-            name="phase_transition",
-            value=1 if phase_changed else 0,
-            comment=f"{prev_phase} -> {next_phase}" if phase_changed else "no change",
-        )
-
-        # Score: data extraction count
         extracted = result.get("extracted_data", {})
-        if isinstance(extracted, dict):
-            extracted_count = len([v for v in extracted.values() if v])
-        else:
-            extracted_count = 0
-        client.score(
-            trace_id=trace_id,
-            name="data_extraction_count",
-            value=extracted_count,
+        extracted_count = sum(1 for v in extracted.values() if v) if isinstance(extracted, dict) else 0
+
+        # All scores are computed first and then enqueued back to back: client.score
+        # only adds to the SDK's ingestion batch, which is sent in a single request
+        # by its background flusher (no per-turn flush).
+        scores = (
+            # escalation triggered
+            {"name": "escalation_triggered", "value": 1 if result.get("escalation_required") else 0},
+            # phase transition occurred
+            {
+                "name": "phase_transition",
+                "value": 1 if phase_changed else 0,
+                "comment": f"{prev_phase} -> {next_phase}" if phase_changed else "no change",
+            },
+            # data extraction count
+            {"name": "data_extraction_count", "value": extracted_count},
         )
+        for score in scores:
+            client.score(trace_id=trace_id, **score)
 
     except Exception as e:
         logger.warning(f"Failed to record Langfuse scores: {e}")
 
 
+# Entropy for session IDs, read from os.urandom in blocks instead of per ID
+_ENTROPY_BLOCK = 4096
+_entropy_buf = bytearray()
+_entropy_lock = threading.Lock()
+
+
+def _fast_uuid4() -> str:
+    """Random (version 4) UUID string, sliced from a shared entropy buffer."""
+    with _entropy_lock:
+        if len(_entropy_buf) < 16:
+            _entropy_buf.extend(os.urandom(_ENTROPY_BLOCK))
+        raw = _entropy_buf[:16]
+        del _entropy_buf[:16]
+    # Set version (4) and variant (RFC 4122) bits, as uuid.uuid4() does
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    return str(uuid.UUID(bytes=bytes(raw)))
+
+
+class _LoopQueue:
+    """
+    `put_nowait` sink for graph nodes (which run in worker threads), read from
+    the event loop that created it.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._items: asyncio.Queue = asyncio.Queue()
+
+    def put_nowait(self, item) -> None:
+        self._loop.call_soon_threadsafe(self._items.put_nowait, item)
+
+    def drain(self) -> list:
+        items = []
+        while not self._items.empty():
+            items.append(self._items.get_nowait())
+        return items
+
+
+class _ShardedTTLCache:
+    """
+    Bounded LRU + TTL mapping for per-session data.
+
+    Split into shards, each a TTLCache behind its own lock, so concurrent
+    sessions rarely contend on the same lock. Entries expire after `ttl`
+    seconds or are evicted (least recently used) when a shard is full;
+    expired sessions are rehydrated from the store on the next turn.
+    """
+
+    _SHARDS = 16
+
+    def __init__(self, maxsize: int, ttl: float):
+        per_shard = max(1, maxsize // self._SHARDS)
+        self._shards = [(TTLCache(maxsize=per_shard, ttl=ttl), threading.Lock()) for _ in range(self._SHARDS)]
+
+    def _shard(self, key):
+        return self._shards[hash(key) % self._SHARDS]
+
+    def __contains__(self, key) -> bool:
+        cache, lock = self._shard(key)
+        with lock:
+            return key in cache
+
+    def __getitem__(self, key):
+        cache, lock = self._shard(key)
+        with lock:
+            return cache[key]
+
+    def __setitem__(self, key, value) -> None:
+        cache, lock = self._shard(key)
+        with lock:
+            cache[key] = value
+
+    def __delitem__(self, key) -> None:
+        cache, lock = self._shard(key)
+        with lock:
+            del cache[key]
+
+    def __len__(self) -> int:
+        return sum(len(cache) for cache, _ in self._shards)
+
+    def get(self, key, default=None):
+        cache, lock = self._shard(key)
+        with lock:
+            return cache.get(key, default)
+
+    def pop(self, key, default=None):
+        cache, lock = self._shard(key)
+        with lock:
+            return cache.pop(key, default)
+
+    def keys(self) -> list:
+        keys = []
+        for cache, lock in self._shards:
+            with lock:
+                keys.extend(cache.keys())
+        return keys
+
+
 class LangGraphOrchestrator:
     """
     LangGraph-based conversation orchestrator.
@@ -122,7 +282,20 @@ class LangGraphOrchestrator:
         self.settings = settings
         self.store = store
         self.excel_service = excel_service
-        self._sessions = {}  # In-memory session storage for now
+        # In-process session caches (bounded, expiring; Redis is the source of truth)
+        max_sessions = getattr(settings, "MAX_ACTIVE_SESSIONS", 10000)
+        session_ttl = getattr(settings, "SESSION_TTL_SECONDS", 3600)
+        self._sessions = _ShardedTTLCache(max_sessions, session_ttl)
+        # phone -> session_id entries are tiny, and they are how an evicted
+        # session is found again in Redis: keep more of them than sessions
+        self._phone_to_session = _ShardedTTLCache(max_sessions * _PHONE_MAP_SIZE_FACTOR, session_ttl)
+        self._serialized_cache = _ShardedTTLCache(max_sessions, session_ttl)  # session_id -> last state_to_dict snapshot
+        self._persisted_msg_count = _ShardedTTLCache(max_sessions, session_ttl)  # session_id -> messages already pushed to Redis
+        self._persisted_snapshot = _ShardedTTLCache(max_sessions, session_ttl)  # session_id -> last snapshot written to Redis
+        # Only the most recent messages go through the graph; older ones stay in the session
+        self._inflight_messages = getattr(settings, "MAX_INFLIGHT_MESSAGES", 20)
+        # session_id -> in-flight Redis write (the response doesn't wait for it)
+        self._pending_writes: Dict[str, asyncio.Task] = {}
     
     async def process_message(
         self,
@@ -150,9 +323,54 @@ class LangGraphOrchestrator:
         Returns:
             Response dict with agent_response, next_phase, etc.
         """
+        async for event in self._turn_events(
+            session_id, user_message, call_direction, agent_name, excel_row_index, stream=False
+        ):
+            pass
+        return event["response"]
+
+    async def process_message_stream(
+        self,
+        session_id: str,
+        user_message: str,
+        call_direction: str = "INBOUND",
+        agent_name: str = "Maria",
+        excel_row_index: int = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Same turn as process_message, yielding progress while the graph runs.
+
+        Events:
+            {"type": "agent_response", "content": str}: the agent_response as soon
+                as the LLM has produced it (before validation/extraction finish)
+            {"type": "node", "node": str}: a graph node finished
+            {"type": "final", "response": dict}: the process_message response
+
+        With a store, the turn is saved to Redis in the background as soon as
+        the final state exists (queued before the final event is handed out,
+        so it is persisted even if the consumer stops iterating there).
+        """
+        async for event in self._turn_events(
+            session_id, user_message, call_direction, agent_name, excel_row_index, stream=True
+        ):
+            if event["type"] == "final" and self.store:
+                self._queue_session_write(session_id, event["response"]["state"])
+            yield event
+
+    async def _turn_events(
+        self,
+        session_id: str,
+        user_message: str,
+        call_direction: str,
+        agent_name: str,
+        excel_row_index: Optional[int],
+        stream: bool,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run one conversation turn; the last event is always {"type": "final", ...}."""
         
-        # Get or create session state
-        if session_id not in self._sessions:
+        # Get session state (rehydrated from Redis if it was evicted from the local cache)
+        state = await self._rehydrate_session(session_id)
+        if state is None:
             # Create new session
             state = create_initial_state(
                 session_id=session_id,
@@ -161,41 +379,46 @@ class LangGraphOrchestrator:
                 excel_row_index=excel_row_index
             )
             self._sessions[session_id] = state
-        else:
-            state = self._sessions[session_id]
         
-        # Add user message to state
-        state['messages'].append(HumanMessage(content=user_message))
-
         prev_phase = state.get("current_phase")
         prev_turn = state.get("turn_count", 0)
 
-        # Build Langfuse handler for observability
-        langfuse_tags = [
-            call_direction.lower(),
-            f"phase:{state.get('current_phase', 'GREETING')}",
-        ]
-        service_type = state.get("service_type")
-        if service_type:
-            langfuse_tags.append(f"service:{service_type}")
-
-        langfuse_handler = get_langfuse_handler(
-            session_id=session_id,
-            user_id=state.get("patient_phone", "unknown"),
-            tags=langfuse_tags,
-            metadata={
-                "agent_name": agent_name,
-                "turn_count": state.get("turn_count", 0),
-                "call_direction": call_direction,
-                "patient_full_name": state.get("patient_full_name", ""),
-                "service_type": service_type or "",
-            },
-            trace_name="conversation_turn",
+        # Build Langfuse handler for observability (tags/metadata only built when enabled)
+        langfuse_handler = (
+            _build_langfuse_handler(session_id, state, call_direction, agent_name)
+            if is_langfuse_enabled() else None
         )
         invoke_config = {"callbacks": [langfuse_handler]} if langfuse_handler else {}
 
-        # Run graph
-        result = self.graph.invoke(state, config=invoke_config)
+        # Run graph (async: sync nodes run in LangGraph's executor, the event loop stays free).
+        # The user message goes in as input (the stored state is not mutated) and
+        # the agent_reply node appends the response through the add_messages reducer.
+        # Only the last MAX_INFLIGHT_MESSAGES are handed to the graph; the older
+        # part of the history is re-attached to the result afterwards.
+        history = state['messages']
+        split = max(len(history) - self._inflight_messages, 0)
+        graph_input = {**state, 'messages': [*history[split:], HumanMessage(content=user_message)]}
+        if not stream:
+            result = await self.graph.ainvoke(graph_input, config=invoke_config)
+        else:
+            result = None
+            early = _LoopQueue()
+            stream_config = {**invoke_config, "configurable": {"agent_response_queue": early}}
+            async for event in self.graph.astream_events(graph_input, config=stream_config, version="v2"):
+                for content in early.drain():
+                    yield {"type": "agent_response", "content": content}
+                if event["event"] != "on_chain_end":
+                    continue
+                if not event.get("parent_ids"):
+                    result = event["data"]["output"]  # root run: final graph state
+                elif event.get("metadata", {}).get("langgraph_node") == event.get("name"):
+                    yield {"type": "node", "node": event["name"]}
+            for content in early.drain():
+                yield {"type": "agent_response", "content": content}
+            if result is None:
+                raise RuntimeError("Graph stream ended without a final state")
+        if split:
+            result['messages'] = [*history[:split], *result['messages']]
 
         # Debug log for phase/turn changes
         try:
@@ -228,21 +451,19 @@ class LangGraphOrchestrator:
         except Exception as e:
             conv_logger.warning(f"Could not log langgraph step: {e}")
         
-        # Add agent response to messages
         agent_response = result.get('agent_response', '')
-        if agent_response:
-            result['messages'].append(AIMessage(content=agent_response))
-        
+
         # Update session
         self._sessions[session_id] = result
+        self._renew_phone_mapping(session_id, result)
 
-        # Langfuse scoring
-        _record_langfuse_scores(
-            langfuse_handler, prev_phase, result
-        )
+        # Langfuse scoring (HTTP calls): off the request path
+        if langfuse_handler:
+            scored = {key: result.get(key) for key in _SCORED_KEYS}
+            _run_in_background(_record_langfuse_scores, langfuse_handler, prev_phase, scored)
 
         # Return response in compatible format
-        return {
+        response = {
             'agent_response': agent_response,
             'next_phase': result.get('next_phase'),
             'current_phase': result.get('current_phase'),
@@ -250,32 +471,107 @@ class LangGraphOrchestrator:
             'escalation_required': result.get('escalation_required', False),
             'escalation_reasons': result.get('escalation_reasons', []),
             'policy_violations': result.get('policy_violations', []),
-            'state': state_to_dict(result)
+            'state': self._serialize_session(session_id, result)
         }
+        yield {"type": "final", "response": response}
+
+    def _queue_session_write(self, session_id: str, serialized: Dict[str, Any]) -> None:
+        """Persist a turn's snapshot without blocking; writes for one session stay in order."""
+        previous_write = self._pending_writes.get(session_id)
+        task = asyncio.create_task(self._save_session(session_id, serialized, previous_write))
+        self._pending_writes[session_id] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._pending_writes.get(session_id) is done:
+                del self._pending_writes[session_id]
+
+        task.add_done_callback(_forget)
+
+    async def _save_session(self, session_id: str, serialized: Dict[str, Any], previous_write) -> None:
+        # The previous turn's write must land first: this one appends after it.
+        # asyncio.wait doesn't raise, so a failed or cancelled predecessor
+        # never drops this (newer) snapshot
+        if previous_write is not None:
+            await asyncio.wait({previous_write})
+        try:
+            messages = serialized.get('messages') or []
+            persisted = self._persisted_msg_count.get(session_id, 0)
+            previous = self._persisted_snapshot.get(session_id)
+            if persisted > len(messages):
+                # History was replaced: rewrite the whole session (one pipelined write)
+                await self.store.set(session_id, serialized)
+            else:
+                # Rewrite only changed fields and push only the messages added since the last save
+                fields = serialized if previous is None else state_delta(previous, serialized)
+                await self.store.append(session_id, fields, messages[persisted:])
+            self._persisted_msg_count[session_id] = len(messages)
+            self._persisted_snapshot[session_id] = serialized
+            logger.info(f"Session {session_id[:8]}... saved to Redis")
+        except Exception as e:
+            logger.error(f"Error saving session to Redis: {e}")
+
+    async def drain_pending_writes(self) -> None:
+        """Wait for every in-flight session write (call on shutdown)."""
+        while self._pending_writes:
+            await asyncio.gather(*list(self._pending_writes.values()), return_exceptions=True)
+
+    def _serialize_session(self, session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Serialize state reusing the session's last snapshot (only new messages are serialized)."""
+        serialized = state_to_dict_incremental(state, self._serialized_cache.get(session_id))
+        self._serialized_cache[session_id] = serialized
+        return serialized
     
     def get_session(self, session_id: str) -> Dict[str, Any]:
         """Get session state"""
-        if session_id in self._sessions:
-            return state_to_dict(self._sessions[session_id])
-        return None
+        state = self._sessions.get(session_id)
+        if state is None:
+            return None
+        return self._serialize_session(session_id, state)
+
+    async def get_session_async(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session state, reloading it from Redis if it was evicted from memory"""
+        state = await self._rehydrate_session(session_id)
+        if state is None:
+            return None
+        return self._serialize_session(session_id, state)
+
+    async def _rehydrate_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the in-memory session; on a miss, load it from the store (if any) back into memory"""
+        state = self._sessions.get(session_id)
+        if state is None and self.store:
+            # Read-your-writes: the last turn's write may still be in flight
+            pending = self._pending_writes.get(session_id)
+            if pending is not None:
+                # Shielded: cancelling this reader must not cancel the write
+                await asyncio.shield(pending)
+            try:
+                stored = await self.store.get(session_id)
+            except Exception as e:
+                logger.error(f"Error loading session from Redis: {e}")
+                return None
+            if stored:
+                self._persisted_msg_count[session_id] = len(stored.get("messages", []))
+                state = self._sessions[session_id] = dict_to_state(stored)
+        return state
     
     def create_session(
         self,
         call_direction: str = "INBOUND",
         agent_name: str = "Maria",
         excel_row_index: int = None,
-        patient_phone: str | None = None
+        patient_phone: str | None = None,
+        patient_data=_NOT_LOADED
     ) -> str:
         """Create a new session and (for outbound) preload data from Excel if available
-            Genera un ID unico con uuid4.hex
-            Busca los datos del paciente en un excel
+            Genera un ID unico (uuid4)
+            Busca los datos del paciente en un excel (o usa `patient_data` si ya se buscaron)
             crea un objeto conversaciónstate con el id, telefono y los demas datos
             asocia el numero de telefono a la sesión
             devuelve un id
         
         
         """
-        session_id = str(uuid.uuid4())
+        session_id = _fast_uuid4()
 
         state = create_initial_state(
             session_id=session_id,
@@ -285,9 +581,13 @@ class LangGraphOrchestrator:
         )
 
         # Preload outbound data from Excel to personalize greeting
-        if call_direction == "OUTBOUND" and self.excel_service and patient_phone:
+        # (`patient_data` left unset means "not looked up yet"; None means "not found")
+        if call_direction == "OUTBOUND" and (
+            patient_data is not _NOT_LOADED or (self.excel_service and patient_phone)
+        ):
             try:
-                patient_data = self.excel_service.get_patient_by_phone(patient_phone)
+                if patient_data is _NOT_LOADED:
+                    patient_data = self.excel_service.get_patient_by_phone(patient_phone)
                 if patient_data:
                     state["patient_full_name"] = patient_data.nombre_completo
                     state["document_type"] = patient_data.tipo_documento
@@ -309,24 +609,26 @@ class LangGraphOrchestrator:
                 logger.warning(f"Could not preload outbound data from Excel: {e}")
 
         if patient_phone:
-            # Maintain phone on state for lookups
+            # Maintain phone on state and in the phone->session index
             state["patient_phone"] = patient_phone
             state["phone"] = patient_phone
+            self._phone_to_session[patient_phone] = session_id
 
         self._sessions[session_id] = state
 
         return session_id
 
+    def _renew_phone_mapping(self, session_id: str, state: Dict[str, Any]) -> None:
+        """Keep the phone -> session entry alive for as long as the session is in use"""
+        patient_phone = state.get("patient_phone")
+        if patient_phone:
+            self._phone_to_session[patient_phone] = session_id
+
     async def find_session_by_phone(self, patient_phone: str) -> Optional[str]:
-        """Find session ID by patient phone number using in-memory map (and log lookup)."""
-        # Fallback to in-memory mapping (even if Redis exists, this is our only index right now)
-        if not hasattr(self, '_phone_to_session'):
-            self._phone_to_session = {}
-        session_key = f"phone:{patient_phone}"
-
-        # Try phone->session map
-        mapped = self._phone_to_session.get(session_key)
-        if mapped:
+        """Find session ID by patient phone number using the phone->session index (and log lookup)."""
+        # The index is the single source of truth: O(1) lookup, no scan over sessions
+        mapped = self._phone_to_session.get(patient_phone)
+        if mapped is not None and (self.store or mapped in self._sessions):
             conv_logger.info(
                 "SESSION_LOOKUP_HIT",
                 extra={
@@ -336,25 +638,13 @@ class LangGraphOrchestrator:
                     "source": "phone_map",
                 }
             )
+            # Renew the entry's TTL: the caller is still talking
+            self._phone_to_session[patient_phone] = mapped
             return mapped
 
-        # Try current in-memory sessions
-        try:
-            for session_id in list(self._sessions.keys()):
-                session_data = self._sessions.get(session_id, {})
-                if session_data.get("patient_phone") == patient_phone:
-                    conv_logger.info(
-                        "SESSION_LOOKUP_HIT",
-                        extra={
-                            "event_type": "session_lookup",
-                            "patient_phone": patient_phone,
-                            "session_id": session_id,
-                            "source": "in_memory_sessions",
-                        }
-                    )
-                    return session_id
-        except Exception as e:
-            conv_logger.warning(f"Error finding session by phone: {e}")
+        if mapped is not None:
+            # Session expired from memory and there is no store to rehydrate it from
+            self._phone_to_session.pop(patient_phone)
 
         conv_logger.info(
             "SESSION_LOOKUP_MISS",
@@ -388,95 +678,82 @@ class LangGraphOrchestrator:
         Returns:
             Dict with response, session info, and metadata
         """
-        print(f"\n{'▼'*80}")
-        print(f"🎬 [ORCHESTRATOR] PROCESANDO MENSAJE")
-        print(f"{'▼'*80}")
-        logger.info(f"[ORCHESTRATOR] patient_phone={patient_phone}")
-        logger.info(f"[ORCHESTRATOR] user_message='{user_message[:100]}...'")
-        logger.info(f"[ORCHESTRATOR] is_outbound={is_outbound}")
+        logger.info(
+            "[ORCHESTRATOR] patient_phone=%s is_outbound=%s user_message='%.100s...'",
+            patient_phone, is_outbound, user_message,
+        )
 
         session_id = None
         session_created = False
+        # Resolved once and reused for session creation, logging and the graph call
+        call_direction = "OUTBOUND" if is_outbound else "INBOUND"
+        agent_name = agent_name or (self.settings.AGENT_NAME if self.settings else "Mar\u00eda")
 
         # Try to find existing session by phone
-        print(f"🔍 [ORCHESTRATOR] Buscando sesión existente para {patient_phone}...")
         session_id = await self.find_session_by_phone(patient_phone)
 
         if not session_id:
             excel_row_index = None
-            # If outbound and Excel service available, preload row index for mapping
+            patient_data = None
+            # If outbound and Excel service available, look the patient up once (row index + preload)
             if is_outbound and self.excel_service:
                 try:
-                    patient_data = self.excel_service.get_patient_by_phone(patient_phone)
+                    # Excel reads are blocking I/O: keep them off the event loop
+                    patient_data = await asyncio.to_thread(self.excel_service.get_patient_by_phone, patient_phone)
                     if patient_data:
                         excel_row_index = patient_data.row_index
                 except Exception as e:
                     logger.warning(f"Error loading patient from Excel: {e}")
 
-            # Create new session
+            # Create new session on the event loop (no Excel I/O left: the lookup
+            # result is passed in). Only the Excel read above runs in a thread
             session_id = self.create_session(
-                call_direction="OUTBOUND" if is_outbound else "INBOUND",
-                agent_name=agent_name or (self.settings.AGENT_NAME if self.settings else "María"),
+                call_direction=call_direction,
+                agent_name=agent_name,
                 excel_row_index=excel_row_index,
-                patient_phone=patient_phone
+                patient_phone=patient_phone,
+                patient_data=patient_data
             )
             session_created = True
-            print(f"✨ [ORCHESTRATOR] Nueva sesión creada: {session_id}")
-            # Track phone -> session_id mapping
-            if not hasattr(self, '_phone_to_session'):
-                self._phone_to_session = {}
-            self._phone_to_session[f"phone:{patient_phone}"] = session_id
             conv_logger.info(
                 "SESSION_CREATED",
                 extra={
                     "event_type": "session_created",
                     "session_id": session_id,
                     "patient_phone": patient_phone,
-                    "call_direction": "OUTBOUND" if is_outbound else "INBOUND",
+                    "call_direction": call_direction,
                     "excel_row_index": excel_row_index,
                 }
             )
         else:
-            print(f"♻️  [ORCHESTRATOR] Sesión existente reutilizada: {session_id}")
             conv_logger.info(
                 "SESSION_REUSED",
                 extra={
                     "event_type": "session_reused",
                     "session_id": session_id,
                     "patient_phone": patient_phone,
-                    "call_direction": "OUTBOUND" if is_outbound else "INBOUND",
+                    "call_direction": call_direction,
                 }
             )
 
-        # Get current state
-        state = self._sessions.get(session_id)
+        # Get current state (from memory, or Redis if it was evicted)
+        state = await self._rehydrate_session(session_id)
         if not state:
-            # Load from Redis if available
-            if self.store:
-                try:
-                    import asyncio
-                    state = await self.store.get(session_id)
-                    if state:
-                        self._sessions[session_id] = state
-                    else:
-                        # Shouldn't happen if session_id was found, but create fallback
-                        state = create_initial_state(
-                            session_id=session_id,
-                            call_direction="OUTBOUND" if is_outbound else "INBOUND",
-                            agent_name=agent_name or (self.settings.AGENT_NAME if self.settings else "María")
-                        )
-                        self._sessions[session_id] = state
-                except Exception as e:
-                    logger.error(f"Error loading session from Redis: {e}")
-                    state = self._sessions.get(session_id)
-        else:
-            state = self._sessions.get(session_id)
+            # Shouldn't happen if session_id was found, but create fallback
+            state = create_initial_state(
+                session_id=session_id,
+                call_direction=call_direction,
+                agent_name=agent_name
+            )
+            self._sessions[session_id] = state
 
-        # Store phone in state
-        state["patient_phone"] = patient_phone
-        # Keep legacy phone field aligned
-        if not state.get("phone"):
-            state["phone"] = patient_phone
+        # Store phone in state (create_session already did for sessions it created;
+        # only fallback-created sessions get here without it)
+        if state.get("patient_phone") != patient_phone:
+            state["patient_phone"] = patient_phone
+            # Keep legacy phone field aligned
+            if not state.get("phone"):
+                state["phone"] = patient_phone
         # Log current session summary
         conv_logger.info(
             "SESSION_STATE",
@@ -495,12 +772,10 @@ class LangGraphOrchestrator:
         processed_message = user_message
 
         # SHORT-CIRCUIT: First outbound turn has a scripted greeting (skip LLM entirely)
-        if is_outbound and turn_count == 0 and user_message.upper() in ["START", "INICIO", "COMENZAR", "/START"]:
+        if is_outbound and turn_count == 0 and user_message.strip().upper() in _OUTBOUND_START_TOKENS:
             patient_name = state.get("patient_full_name", "")
             scripted_response = f"\u00bfTengo el gusto de hablar con {patient_name}?" if patient_name else "\u00bfTengo el gusto de hablar con el paciente?"
-            print(f"\n\u26a1 [ORCHESTRATOR] SHORT-CIRCUIT: Primer turno outbound (sin LLM)")
-            print(f"   Respuesta directa: '{scripted_response}'")
-            logger.info(f"[ORCHESTRATOR] Short-circuit first outbound turn (no LLM call)")
+            logger.info("[ORCHESTRATOR] Short-circuit first outbound turn (no LLM call)")
 
             # Update state manually (same as LangGraph would)
             state['messages'].append(HumanMessage(content="/START"))
@@ -517,56 +792,43 @@ class LangGraphOrchestrator:
                 'escalation_required': False,
                 'escalation_reasons': [],
                 'policy_violations': [],
-                'state': state_to_dict(state),
+                'state': self._serialize_session(session_id, state),
             }
         else:
-            print(f"\n\U0001F680 [ORCHESTRATOR] Ejecutando LangGraph...")
-            print(f"   Session: {session_id[:8]}")
-            print(f"   Fase actual: {state.get('current_phase', 'GREETING')}")
-            print(f"   Turno: {turn_count}")
-            logger.info(f"[ORCHESTRATOR] Procesando mensaje para session_id={session_id[:8] if session_id else 'None'}...")
+            logger.debug(
+                "[ORCHESTRATOR] Ejecutando LangGraph session=%.8s phase=%s turn=%s",
+                session_id, state.get('current_phase', 'GREETING'), turn_count,
+            )
             try:
                 response = await self.process_message(
                     session_id=session_id,
                     user_message=processed_message,
-                    call_direction="OUTBOUND" if is_outbound else "INBOUND",
-                    agent_name=agent_name or (self.settings.AGENT_NAME if self.settings else "Mar\u00eda")
+                    call_direction=call_direction,
+                    agent_name=agent_name
                 )
-                print(f"\u2705 [ORCHESTRATOR] LangGraph completado")
-                logger.info(f"[ORCHESTRATOR] Mensaje procesado exitosamente")
+                logger.debug("[ORCHESTRATOR] Mensaje procesado exitosamente")
             except Exception as e:
                 logger.error(f"[ORCHESTRATOR] ERROR en process_message: {e}", exc_info=True)
-                flush_langfuse()
+                if is_langfuse_enabled():
+                    _run_in_background(flush_langfuse)
                 raise
 
-        # Save updated state to Redis if store is available
+        # Save updated state to Redis if store is available (in the background:
+        # the response doesn't wait for the round trip)
         if self.store:
-            try:
-                import asyncio
-                updated_state = self._sessions.get(session_id, {})
-                # Clean state for Redis (remove non-serializable objects)
-                clean_state = {k: v for k, v in updated_state.items()
-                              if k not in ['messages'] and not callable(v)}
-                # Add messages back as dicts
-                if 'messages' in updated_state:
-                    clean_state['messages'] = [
-                        {'role': 'user' if hasattr(m, 'type') and m.type == 'human' else 'assistant',
-                         'content': m.content if hasattr(m, 'content') else str(m)}
-                        for m in updated_state.get('messages', [])
-                    ]
-                await self.store.set(session_id, clean_state)
-                logger.info(f"Session {session_id[:8]}... saved to Redis")
-            except Exception as e:
-                logger.error(f"Error saving session to Redis: {e}")
+            # Reuse this turn's serialized snapshot (messages already as dicts)
+            self._queue_session_write(session_id, response['state'])
 
         # Add session management info
         response["session_created"] = session_created
         response["conversation_phase"] = response.get("current_phase")
-        response["call_direction"] = "OUTBOUND" if is_outbound else "INBOUND"
+        response["call_direction"] = call_direction
         response["requires_escalation"] = response.get("escalation_required", False)
         response["metadata"] = {}
 
-        # Flush Langfuse events before returning response
-        flush_langfuse()
+        # Langfuse flushes on its own background thread (and at exit); only force
+        # a per-turn flush when configured, without blocking the response
+        if app_settings.LANGFUSE_ENFORCE_FLUSH and is_langfuse_enabled():
+            _run_in_background(flush_langfuse)
 
         return response
@@ -1,6 +1,7 @@
 # Policies module
 from src.agent.policies.policy_schema import (
-    Policy, PolicyCategory, PolicySeverity, PolicyViolation, PolicyEvaluationResult
+    Policy, PolicyCategory, PolicySeverity, PolicyViolation, PolicyEvaluationResult,
+    PolicyEvaluationContext
 )
 from src.agent.policies.policy_engine import PolicyEngine
 from src.agent.policies.policy_definitions import (
@@ -9,6 +10,6 @@ from src.agent.policies.policy_definitions import (
 
 __all__ = [
     'Policy', 'PolicyCategory', 'PolicySeverity', 'PolicyViolation', 'PolicyEvaluationResult',
-    'PolicyEngine', 'ALL_POLICIES', 'CONDUCTOR_001', 'SERVICIO_001', 'GEOGRAFIA_001', 
+    'PolicyEvaluationContext', 'PolicyEngine', 'ALL_POLICIES', 'CONDUCTOR_001', 'SERVICIO_001', 'GEOGRAFIA_001', 
     'MODALIDAD_001', 'PROTOCOLO_001'
 ]
@@ -1,134 +1,176 @@
 # Policy definitions file
-from typing import Dict, Any, Optional, List
-from src.agent.policies.policy_schema import Policy, PolicyCategory, PolicySeverity, PolicyViolation
-
-def check_conductor_assignment_request(state: Dict[str, Any]) -> Optional[PolicyViolation]:
-    messages = state.get('messages', [])
-    if not messages:
-        return None
-    last_msg = ''
-    for msg in reversed(messages):
-        if hasattr(msg, 'type') and msg.type == 'human':
-            last_msg = msg.content.lower()
-            break
-    keywords = ['quiero al conductor', 'prefiero al conductor']
-    for kw in keywords:
-        if kw in last_msg:
-            return PolicyViolation('CONDUCTOR_001', 'Limite Conductores', PolicySeverity.WARNING, 'Solicita conductor', 'msg', last_msg[:50], 'Enviar sugerencia', 'Enviare sugerencia')
+import re
+from typing import Dict, List, Optional, Tuple
+from src.agent.policies.policy_schema import (
+    Policy, PolicyCategory, PolicyEvaluationContext, PolicySeverity, PolicyViolation
+)
+
+
+# Keywords por política, en orden de prioridad (la primera presente es la que se reporta)
+_CONDUCTOR_REQUEST_KEYWORDS = ('quiero al conductor', 'prefiero al conductor')
+_MODALITY_KEYWORDS = ('expreso', 'exclusivo')
+# Keywords para detectar quejas de conducta
+_COMPLAINT_KEYWORDS = (
+    'grosero', 'grita', 'gritaba', 'no ayud', 'no me ayud',
+    'mal servicio', 'mala experiencia', 'inconveniente',
+    'problemas con el conductor', 'conductor muy',
+    'no fue', 'no es', 'servicial'
+)
+_SPECIAL_NEEDS_KEYWORDS = (
+    'silla de ruedas', 'silla ruedas', 'discapacidad',
+    'oxígeno', 'camilla', 'vehículo grande',
+    'vehículo especial', 'necesidades especiales',
+    'con bastón', 'con muletas', 'discapacitado',
+    'acceso restringido', 'movilidad limitada'
+)
+
+_GEO_RE = re.compile(r"vereda|rural| km ")
+
+
+def _build_keyword_matcher(keywords_by_policy: Dict[str, Tuple[str, ...]]):
+    """
+    Compila las keywords de varias políticas en una sola alternancia.
+
+    Cada alternativa va dentro de un lookahead para que finditer pruebe todas
+    las posiciones: un solo recorrido del texto encuentra las keywords de
+    todas las políticas a la vez (en vez de un `in` por keyword y política).
+
+    Returns:
+        Tuple de (patrón compilado, {keyword: (policy_id, prioridad)})
+    """
+    owners = {}
+    for policy_id, keywords in keywords_by_policy.items():
+        for priority, keyword in enumerate(keywords):
+            owners.setdefault(keyword, (policy_id, priority))
+    alternation = '|'.join(re.escape(k) for k in sorted(owners, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))"), owners
+
+
+def _scan_keywords(matcher, text: str) -> Dict[str, str]:
+    """{policy_id: keyword de mayor prioridad encontrada en `text`}, en un solo recorrido."""
+    pattern, owners = matcher
+    best = {}
+    for match in pattern.finditer(text):
+        keyword = match.group(1)
+        policy_id, priority = owners[keyword]
+        found = best.get(policy_id)
+        if found is None or priority < found[1]:
+            best[policy_id] = (keyword, priority)
+    return {policy_id: keyword for policy_id, (keyword, _) in best.items()}
+
+
+# Políticas que miran el último mensaje del usuario / todo su historial
+_LAST_MESSAGE_MATCHER = _build_keyword_matcher({
+    'CONDUCTOR_001': _CONDUCTOR_REQUEST_KEYWORDS,
+    'MODALIDAD_001': _MODALITY_KEYWORDS,
+    'CONDUCTOR_COMPLAINT_001': _COMPLAINT_KEYWORDS,
+})
+_HISTORY_MATCHER = _build_keyword_matcher({
+    'SPECIAL_NEEDS_001': _SPECIAL_NEEDS_KEYWORDS,
+})
+
+
+def _last_message_hits(ctx: PolicyEvaluationContext) -> Dict[str, str]:
+    # Un solo escaneo por evaluación, compartido por todas las políticas
+    hits = ctx.scan_cache.get('last_message')
+    if hits is None:
+        hits = ctx.scan_cache['last_message'] = _scan_keywords(_LAST_MESSAGE_MATCHER, ctx.last_human_lower)
+    return hits
+
+
+def _history_hits(ctx: PolicyEvaluationContext) -> Dict[str, str]:
+    hits = ctx.scan_cache.get('history')
+    if hits is None:
+        hits = ctx.scan_cache['history'] = _scan_keywords(_HISTORY_MATCHER, ctx.all_human_lower)
+    return hits
+
+
+def check_conductor_assignment_request(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
+    last_msg = ctx.last_human_lower
+    if 'CONDUCTOR_001' in _last_message_hits(ctx):
+        return PolicyViolation('CONDUCTOR_001', 'Limite Conductores', PolicySeverity.WARNING, 'Solicita conductor', 'msg', last_msg[:50], 'Enviar sugerencia', 'Enviare sugerencia')
     return None
 
-def check_eps_authorization(state: Dict[str, Any]) -> Optional[PolicyViolation]:
-    eps = (state.get('eps') or '').lower()
+def check_eps_authorization(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
+    eps = ctx.eps_lower
     if eps and eps != 'cosalud':
         return PolicyViolation('SERVICIO_001', 'Solo Cosalud', PolicySeverity.BLOCKING, 'EPS incorrecta', 'eps', eps, 'Contactar EPS', 'Solo Cosalud')
     return None
 
-def check_geographic_coverage(state: Dict[str, Any]) -> Optional[PolicyViolation]:
-    addr = (state.get('pickup_address') or '').lower()
-    if any(k in addr for k in ['vereda', 'rural', ' km ']):
+def check_geographic_coverage(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
+    addr = ctx.pickup_lower
+    if _GEO_RE.search(addr):
         return PolicyViolation('GEOGRAFIA_001', 'Cobertura', PolicySeverity.BLOCKING, 'Fuera cobertura', 'address', addr[:50], 'EPS', 'Solo urbano')
     return None
 
-def check_transport_modality_request(state: Dict[str, Any]) -> Optional[PolicyViolation]:
-    messages = state.get('messages', [])
-    if not messages:
-        return None
-    last_msg = ''
-    for msg in reversed(messages):
-        if hasattr(msg, 'type') and msg.type == 'human':
-            last_msg = msg.content.lower()
-            break
-    if any(k in last_msg for k in ['expreso', 'exclusivo']):
+def check_transport_modality_request(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
+    last_msg = ctx.last_human_lower
+    if 'MODALIDAD_001' in _last_message_hits(ctx):
         return PolicyViolation('MODALIDAD_001', 'Ruta vs Expreso', PolicySeverity.WARNING, 'Solicita expreso', 'msg', last_msg[:50], 'EPS', 'Estandar ruta')
     return None
 
-def check_recording_notice_given(state: Dict[str, Any]) -> Optional[PolicyViolation]:
+def check_recording_notice_given(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
     return None
 
-def check_conductor_complaint(state: Dict[str, Any]) -> Optional[PolicyViolation]:
+def check_conductor_complaint(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
     """Detecta quejas sobre el conductor (grosería, falta de ayuda, etc.)"""
-    messages = state.get('messages', [])
-    if not messages:
-        return None
-    last_msg = ''
-    for msg in reversed(messages):
-        if hasattr(msg, 'type') and msg.type == 'human':
-            last_msg = msg.content.lower()
-            break
-
-    # Keywords para detectar quejas de conducta
-    complaint_keywords = [
-        'grosero', 'grita', 'gritaba', 'no ayud', 'no me ayud',
-        'mal servicio', 'mala experiencia', 'inconveniente',
-        'problemas con el conductor', 'conductor muy',
-        'no fue', 'no es', 'servicial'
-    ]
-
-    for kw in complaint_keywords:
-        if kw in last_msg:
-            return PolicyViolation(
-                'CONDUCTOR_COMPLAINT_001',
-                'Queja Conductor',
-                PolicySeverity.WARNING,
-                'Queja de mal servicio del conductor',
-                'msg',
-                last_msg[:100],
-                'Registrar e Investigar',
-                'Se registro la queja para revision'
-            )
+    last_msg = ctx.last_human_lower
+    if 'CONDUCTOR_COMPLAINT_001' in _last_message_hits(ctx):
+        return PolicyViolation(
+            'CONDUCTOR_COMPLAINT_001',
+            'Queja Conductor',
+            PolicySeverity.WARNING,
+            'Queja de mal servicio del conductor',
+            'msg',
+            last_msg[:100],
+            'Registrar e Investigar',
+            'Se registro la queja para revision'
+        )
     return None
 
-def check_special_needs(state: Dict[str, Any]) -> Optional[PolicyViolation]:
+def check_special_needs(ctx: PolicyEvaluationContext) -> Optional[PolicyViolation]:
     """Detecta necesidades especiales (silla de ruedas, oxígeno, etc.)"""
-    messages = state.get('messages', [])
-    if not messages:
-        return None
-
     # También revisar todo el historial para necesidades especiales
-    all_text = ''
-    for msg in messages:
-        if hasattr(msg, 'type') and msg.type == 'human':
-            all_text += ' ' + msg.content.lower()
-
-    special_needs_keywords = [
-        'silla de ruedas', 'silla ruedas', 'discapacidad',
-        'oxígeno', 'oxígeno', 'camilla', 'vehículo grande',
-        'vehículo especial', 'necesidades especiales',
-        'con bastón', 'con muletas', 'discapacitado',
-        'acceso restringido', 'movilidad limitada'
-    ]
-
-    for kw in special_needs_keywords:
-        if kw in all_text:
-            return PolicyViolation(
-                'SPECIAL_NEEDS_001',
-                'Necesidades Especiales',
-                PolicySeverity.WARNING,
-                f'Necesidades especiales detectadas: {kw}',
-                'special_needs',
-                kw,
-                'Validar con EPS',
-                'Se requiere vehículo adaptado'
-            )
+    kw = _history_hits(ctx).get('SPECIAL_NEEDS_001')
+    if kw:
+        return PolicyViolation(
+            'SPECIAL_NEEDS_001',
+            'Necesidades Especiales',
+            PolicySeverity.WARNING,
+            f'Necesidades especiales detectadas: {kw}',
+            'special_needs',
+            kw,
+            'Validar con EPS',
+            'Se requiere vehículo adaptado'
+        )
     return None
 
-CONDUCTOR_001 = Policy('CONDUCTOR_001', 'Limite Conductores', PolicyCategory.CONDUCTOR, 'No asignar', PolicySeverity.WARNING, ['*'], ['BOTH'], check_conductor_assignment_request, 'Enviare sugerencia', 'No asignes conductores', ['conductor'])
-SERVICIO_001 = Policy('SERVICIO_001', 'Solo Cosalud', PolicyCategory.SERVICIO, 'Solo Cosalud', PolicySeverity.BLOCKING, ['IDENTIFICATION'], ['BOTH'], check_eps_authorization, 'Solo Cosalud', 'CRITICO: Solo Cosalud', ['eps'])
-GEOGRAFIA_001 = Policy('GEOGRAFIA_001', 'Cobertura SM', PolicyCategory.GEOGRAFIA, 'Solo urbano', PolicySeverity.BLOCKING, ['SERVICE_COORDINATION'], ['BOTH'], check_geographic_coverage, 'Solo urbano', 'CRITICO: Solo urbano', ['vereda'])
-MODALIDAD_001 = Policy('MODALIDAD_001', 'Ruta', PolicyCategory.MODALIDAD, 'Ruta std', PolicySeverity.WARNING, ['SERVICE_COORDINATION'], ['BOTH'], check_transport_modality_request, 'Ruta std', 'Ruta std', ['expreso'])
-PROTOCOLO_001 = Policy('PROTOCOLO_001', 'Grabacion', PolicyCategory.PROTOCOLO, 'Informar', PolicySeverity.BLOCKING, ['GREETING'], ['BOTH'], check_recording_notice_given, 'Grabada', 'Informa grabacion', ['grab'])
+CONDUCTOR_001 = Policy('CONDUCTOR_001', 'Limite Conductores', PolicyCategory.CONDUCTOR, 'No asignar', PolicySeverity.WARNING, frozenset({'*'}), frozenset({'BOTH'}), check_conductor_assignment_request, 'Enviare sugerencia', 'No asignes conductores', ['conductor'])
+SERVICIO_001 = Policy('SERVICIO_001', 'Solo Cosalud', PolicyCategory.SERVICIO, 'Solo Cosalud', PolicySeverity.BLOCKING, frozenset({'IDENTIFICATION'}), frozenset({'BOTH'}), check_eps_authorization, 'Solo Cosalud', 'CRITICO: Solo Cosalud', ['eps'])
+GEOGRAFIA_001 = Policy('GEOGRAFIA_001', 'Cobertura SM', PolicyCategory.GEOGRAFIA, 'Solo urbano', PolicySeverity.BLOCKING, frozenset({'SERVICE_COORDINATION'}), frozenset({'BOTH'}), check_geographic_coverage, 'Solo urbano', 'CRITICO: Solo urbano', ['vereda'])
+MODALIDAD_001 = Policy('MODALIDAD_001', 'Ruta', PolicyCategory.MODALIDAD, 'Ruta std', PolicySeverity.WARNING, frozenset({'SERVICE_COORDINATION'}), frozenset({'BOTH'}), check_transport_modality_request, 'Ruta std', 'Ruta std', ['expreso'])
+PROTOCOLO_001 = Policy('PROTOCOLO_001', 'Grabacion', PolicyCategory.PROTOCOLO, 'Informar', PolicySeverity.BLOCKING, frozenset({'GREETING'}), frozenset({'BOTH'}), check_recording_notice_given, 'Grabada', 'Informa grabacion', ['grab'])
 
-CONDUCTOR_COMPLAINT_001 = Policy('CONDUCTOR_COMPLAINT_001', 'Queja Conductor', PolicyCategory.CONDUCTOR, 'Registrar queja y mejorar servicio', PolicySeverity.WARNING, ['*'], ['BOTH'], check_conductor_complaint, 'Registrar Queja', 'IMPORTANTE: Se detectó queja del conductor - Registrar para investigación', ['grosero', 'mal servicio'])
+CONDUCTOR_COMPLAINT_001 = Policy('CONDUCTOR_COMPLAINT_001', 'Queja Conductor', PolicyCategory.CONDUCTOR, 'Registrar queja y mejorar servicio', PolicySeverity.WARNING, frozenset({'*'}), frozenset({'BOTH'}), check_conductor_complaint, 'Registrar Queja', 'IMPORTANTE: Se detectó queja del conductor - Registrar para investigación', ['grosero', 'mal servicio'])
 
-SPECIAL_NEEDS_001 = Policy('SPECIAL_NEEDS_001', 'Necesidades Especiales', PolicyCategory.SERVICIO, 'Validar con EPS si se requiere vehículo adaptado', PolicySeverity.WARNING, ['*'], ['BOTH'], check_special_needs, 'Adaptar Vehículo', 'Se requiere vehículo adaptado - Validar con EPS', ['silla', 'oxígeno', 'discapacidad'])
+SPECIAL_NEEDS_001 = Policy('SPECIAL_NEEDS_001', 'Necesidades Especiales', PolicyCategory.SERVICIO, 'Validar con EPS si se requiere vehículo adaptado', PolicySeverity.WARNING, frozenset({'*'}), frozenset({'BOTH'}), check_special_needs, 'Adaptar Vehículo', 'Se requiere vehículo adaptado - Validar con EPS', ['silla', 'oxígeno', 'discapacidad'])
 
 ALL_POLICIES = [CONDUCTOR_001, SERVICIO_001, GEOGRAFIA_001, MODALIDAD_001, PROTOCOLO_001, CONDUCTOR_COMPLAINT_001, SPECIAL_NEEDS_001]
 
+# Indexed once at import; the getters below are plain dict lookups
+_POLICY_BY_ID: Dict[str, Policy] = {p.id: p for p in ALL_POLICIES}
+_POLICIES_BY_CATEGORY: Dict[PolicyCategory, List[Policy]] = {}
+_POLICIES_BY_SEVERITY: Dict[PolicySeverity, List[Policy]] = {}
+for _policy in ALL_POLICIES:
+    _POLICIES_BY_CATEGORY.setdefault(_policy.category, []).append(_policy)
+    _POLICIES_BY_SEVERITY.setdefault(_policy.severity, []).append(_policy)
+del _policy
+
 def get_policy_by_id(pid: str) -> Optional[Policy]:
-    return next((p for p in ALL_POLICIES if p.id == pid), None)
+    return _POLICY_BY_ID.get(pid)
 
 def get_policies_by_category(cat: PolicyCategory) -> List[Policy]:
-    return [p for p in ALL_POLICIES if p.category == cat]
+    return list(_POLICIES_BY_CATEGORY.get(cat, ()))
 
 def get_policies_by_severity(sev: PolicySeverity) -> List[Policy]:
-    return [p for p in ALL_POLICIES if p.severity == sev]
+    return list(_POLICIES_BY_SEVERITY.get(sev, ()))
@@ -1,35 +1,76 @@
 # Policy Engine for evaluating policies
-from typing import Dict, Any, List
-from src.agent.policies.policy_schema import Policy, PolicyEvaluationResult, PolicyViolation
+from typing import Dict, Any, List, Tuple
+from src.agent.policies.policy_schema import (
+    Policy, PolicyEvaluationContext, PolicyEvaluationResult, PolicySeverity
+)
 from src.agent.policies.policy_definitions import ALL_POLICIES
+from src.domain.value_objects.conversation_phase import ConversationPhase
+
+_DIRECTIONS = ('INBOUND', 'OUTBOUND')
+
+_ContextEntry = Tuple[Tuple[Policy, ...], Tuple[Policy, ...], Tuple[str, ...], str]
+
 
 class PolicyEngine:
     def __init__(self, policies: List[Policy] = None):
         self.policies = policies or ALL_POLICIES
+        # Applicability is static: resolve it once per (phase, direction),
+        # together with a BLOCKING-first ordering (for stop_on_blocking), the
+        # policy ids and the joined prompt text for that pair
+        self._by_ctx: Dict[Tuple[str, str], _ContextEntry] = {}
+        for phase in ConversationPhase:
+            for direction in _DIRECTIONS:
+                self._resolve(phase.value, direction)
+
+    def _resolve(self, phase: str, direction: str) -> _ContextEntry:
+        applicable = tuple(p for p in self.policies if p.is_applicable(phase, direction))
+        entry = (
+            applicable,
+            tuple(sorted(applicable, key=lambda p: p.severity is not PolicySeverity.BLOCKING)),
+            tuple(p.id for p in applicable),
+            '\n\n'.join(p.prompt_injection for p in applicable),
+        )
+        self._by_ctx[(phase, direction)] = entry
+        return entry
     
-    def evaluate(self, state: Dict[str, Any], phase: str, direction: str) -> PolicyEvaluationResult:
-        applicable = []
+    def evaluate(
+        self,
+        state: Dict[str, Any],
+        phase: str,
+        direction: str,
+        stop_on_blocking: bool = False,
+    ) -> PolicyEvaluationResult:
+        """
+        Evaluate the policies that apply to this phase/direction.
+
+        With stop_on_blocking=True the BLOCKING policies (cheap single-field
+        checks) run first and evaluation stops at the first one that fires, so
+        `violations` only holds that violation. For callers that just need
+        `has_blocking`.
+        """
+        entry = self._by_ctx.get((phase, direction))
+        if entry is None:
+            # Phase/direction outside the precomputed table
+            entry = self._resolve(phase, direction)
+        applicable, blocking_first, policy_ids, prompt_injection = entry
         violations = []
-        prompt_parts = []
+        blocking = []
+        # Shared by every check: the last user message is scanned/lower-cased once
+        context = PolicyEvaluationContext.from_state(state)
         
-        for policy in self.policies:
-            if policy.is_applicable(phase, direction):
-                applicable.append(policy.id)
-                prompt_parts.append(policy.prompt_injection)
-                violation = policy.evaluate(state)
-                if violation:
-                    violations.append(violation)
-        
-        prompt_injection = '\n\n'.join(prompt_parts) if prompt_parts else ''
+        for policy in blocking_first if stop_on_blocking else applicable:
+            violation = policy.evaluate(context)
+            if violation:
+                violations.append(violation)
+                if violation.severity is PolicySeverity.BLOCKING:
+                    blocking.append(violation)
+                    if stop_on_blocking:
+                        break
         
         return PolicyEvaluationResult(
-            applicable_policies=applicable,
+            applicable_policies=list(policy_ids),
             violations=violations,
             prompt_injection=prompt_injection,
-            blocking_violations=[],
-            has_blocking=False
+            blocking_violations=blocking,
+            has_blocking=bool(blocking)
         )
-    
-    def get_blocking_violations(self, violations: List[PolicyViolation]) -> List[PolicyViolation]:
-        from src.agent.policies.policy_schema import PolicySeverity
-        return [v for v in violations if v.severity == PolicySeverity.BLOCKING]
@@ -6,7 +6,8 @@ This module defines the data structures for the policy-based validation system.
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Callable, List, Optional, Dict, Any
+from functools import cached_property, lru_cache
+from typing import Callable, FrozenSet, List, Optional, Dict, Any, Union
 
 
 class PolicyCategory(str, Enum):
@@ -46,10 +47,84 @@ class PolicyEvaluationResult:
     prompt_injection: str
     blocking_violations: List[PolicyViolation]
     has_blocking: bool
-    
-    def __post_init__(self):
-        self.blocking_violations = [v for v in self.violations if v.severity == PolicySeverity.BLOCKING]
-        self.has_blocking = len(self.blocking_violations) > 0
+    """
+    blocking_violations/has_blocking are filled by the engine in its single
+    pass over the policies; read them from here instead of re-filtering
+    `violations`.
+    """
+
+
+# A user turn is `type == 'human'` on LangChain messages; serialized history
+# (Redis / API payloads) carries role 'human'/'user' and type 'HumanMessage'
+_HUMAN_MESSAGE_KINDS = frozenset({'human', 'user', 'HumanMessage'})
+
+
+def human_message_content(msg: Any) -> Optional[str]:
+    """Return the text of a user message (LangChain message or dict), None for any other entry."""
+    if isinstance(msg, dict):
+        if msg.get('type') in _HUMAN_MESSAGE_KINDS or msg.get('role') in _HUMAN_MESSAGE_KINDS:
+            return msg.get('content') or ''
+        return None
+    if getattr(msg, 'type', None) == 'human':
+        return msg.content
+    return None
+
+
+@lru_cache(maxsize=4096)
+def lower_message_text(content: str) -> str:
+    """
+    Lower-cased message text, memoized by content.
+
+    Messages are immutable once they are in the history, so each user turn is
+    lower-cased once for the whole conversation instead of on every evaluation.
+    LangChain messages don't take extra attributes and serialized ones are
+    plain dicts, so the cache is keyed by the text itself.
+    """
+    return content.lower()
+
+
+@dataclass
+class PolicyEvaluationContext:
+    """
+    Values derived from the conversation state once per evaluation.
+
+    The engine builds a single context and hands it to every applicable
+    policy, so the last user message (and, on demand, the whole user
+    history) is found and lower-cased once instead of once per check.
+    """
+    state: Dict[str, Any]
+    last_human_lower: str = ""
+    eps_lower: str = ""
+    pickup_lower: str = ""
+    scan_cache: Dict[str, Any] = field(default_factory=dict)
+    """Per-evaluation results shared between checks (e.g. one keyword scan for all of them)"""
+
+    @cached_property
+    def all_human_lower(self) -> str:
+        """Every user message of the conversation, lower-cased (built on first use)."""
+        parts = []
+        for msg in self.state.get('messages') or []:
+            content = human_message_content(msg)
+            if content is not None:
+                parts.append(lower_message_text(content))
+        # Each message keeps its leading separator, as the keyword patterns expect
+        return ' ' + ' '.join(parts) if parts else ''
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "PolicyEvaluationContext":
+        last_human_lower = ""
+        messages = state.get('messages') or []
+        for i in range(len(messages) - 1, -1, -1):
+            content = human_message_content(messages[i])
+            if content is not None:
+                last_human_lower = lower_message_text(content)
+                break
+        return cls(
+            state=state,
+            last_human_lower=last_human_lower,
+            eps_lower=(state.get('eps') or '').lower(),
+            pickup_lower=(state.get('pickup_address') or '').lower(),
+        )
 
 
 @dataclass
@@ -75,13 +150,13 @@ class Policy:
     severity: PolicySeverity
     """Severity level if policy is violated"""
     
-    applicable_phases: List[str]
-    """List of phases where this policy applies (* = all phases)"""
+    applicable_phases: FrozenSet[str]
+    """Phases where this policy applies (* = all phases)"""
     
-    applicable_directions: List[str]
-    """List of call directions where this applies (INBOUND, OUTBOUND, BOTH)"""
+    applicable_directions: FrozenSet[str]
+    """Call directions where this applies (INBOUND, OUTBOUND, BOTH)"""
     
-    check_function: Callable[[Dict[str, Any]], Optional[PolicyViolation]]
+    check_function: Callable[[PolicyEvaluationContext], Optional[PolicyViolation]]
     """Function that checks if policy is violated. Returns PolicyViolation if violated, None otherwise."""
     
     response_template: str = ""
@@ -104,24 +179,22 @@ class Policy:
         Returns:
             True if policy is applicable, False otherwise
         """
-        # Check phase
-        if '*' not in self.applicable_phases and phase not in self.applicable_phases:
-            return False
-        
-        # Check direction
-        if 'BOTH' in self.applicable_directions:
-            return True
-        
-        return direction in self.applicable_directions
+        # Set membership: a few hash lookups whatever the number of phases
+        return (
+            ('*' in self.applicable_phases or phase in self.applicable_phases)
+            and ('BOTH' in self.applicable_directions or direction in self.applicable_directions)
+        )
     
-    def evaluate(self, state: Dict[str, Any]) -> Optional[PolicyViolation]:
+    def evaluate(self, state: Union[Dict[str, Any], PolicyEvaluationContext]) -> Optional[PolicyViolation]:
         """
         Evaluate this policy against the current state.
         
         Args:
-            state: Current conversation state
+            state: Current conversation state, or a context already built from it
             
         Returns:
             PolicyViolation if policy is violated, None otherwise
         """
+        if not isinstance(state, PolicyEvaluationContext):
+            state = PolicyEvaluationContext.from_state(state)
         return self.check_function(state)
@@ -3,6 +3,7 @@ Prompt Builder - Versión con Supervisor Robusto
 Integra políticas, casos (Few-Shot) y ajustes de tono.
 """
 import logging
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from src.domain.value_objects.conversation_phase import ConversationPhase
 from src.agent.prompts.langgraph_prompts import (
@@ -18,6 +19,27 @@ from src.agent.prompts.langgraph_prompts import (
 logger = logging.getLogger(__name__)
 
 
+# Las partes fijas del prompt solo dependen del agente o de la fase:
+# se renderizan una vez y se reutilizan en cada turno.
+@lru_cache(maxsize=64)
+def _agent_personality(agent_name: str, company_name: str, eps_name: str) -> str:
+    return AGENT_PERSONALITY.format(
+        agent_name=agent_name,
+        company_name=company_name,
+        eps_name=eps_name
+    )
+
+
+@lru_cache(maxsize=None)
+def _output_section(phase: ConversationPhase) -> str:
+    """Reglas de extracción + formato de salida (con las transiciones válidas de la fase)."""
+    return "\n".join((
+        EXTRACTION_RULES,
+        "\nRESPONDE CON JSON VÁLIDO:",
+        OUTPUT_SCHEMA_TEMPLATE.format(valid_phases=get_valid_next_phases(phase)),
+    ))
+
+
 def build_prompt(
     phase: ConversationPhase,
     agent_name: str,
@@ -68,11 +90,7 @@ def build_prompt(
     prompt_parts = []
 
     # 1. Personalidad del agente
-    prompt_parts.append(AGENT_PERSONALITY.format(
-        agent_name=agent_name,
-        company_name=company_name,
-        eps_name=eps_name
-    ))
+    prompt_parts.append(_agent_personality(agent_name, company_name, eps_name))
 
     # 2. NUEVO: Instrucción de tono (si hay emoción fuerte)
     if tone_instruction:
@@ -141,13 +159,8 @@ EJEMPLO DE REFERENCIA:
 ESTADO: Ya diste saludo y aviso de grabación. NO los repitas.
 """)
 
-    # 9. Reglas de extracción
-    prompt_parts.append(EXTRACTION_RULES)
-
-    # 10. Formato de salida
-    valid_phases = get_valid_next_phases(phase)
-    prompt_parts.append("\nRESPONDE CON JSON VÁLIDO:")
-    prompt_parts.append(OUTPUT_SCHEMA_TEMPLATE.format(valid_phases=valid_phases))
+    # 9-10. Reglas de extracción + formato de salida (precalculado por fase)
+    prompt_parts.append(_output_section(phase))
 
     prompt = "\n".join(prompt_parts)
 
@@ -161,40 +174,42 @@ ESTADO: Ya diste saludo y aviso de grabación. NO los repitas.
     return prompt
 
 
+_PHASE_RELEVANT_KEYS = {
+    ConversationPhase.OUTBOUND_GREETING: (
+        "patient_full_name", "service_type", "appointment_date", "appointment_time", "pickup_time"
+    ),
+    ConversationPhase.OUTBOUND_SERVICE_CONFIRMATION: (
+        "patient_full_name", "service_type", "appointment_date",
+        "appointment_time", "pickup_time", "pickup_address", "contact_name"
+    ),
+    ConversationPhase.OUTBOUND_SPECIAL_CASES: (
+        "patient_full_name", "service_type", "appointment_date",
+        "appointment_time", "pickup_time", "contact_name"
+    ),
+    ConversationPhase.OUTBOUND_CLOSING: (
+        "patient_full_name", "service_type", "appointment_date",
+        "appointment_time", "pickup_time", "contact_name"
+    ),
+    ConversationPhase.IDENTIFICATION: (
+        "patient_full_name", "document_type", "document_number", "eps"
+    ),
+    ConversationPhase.SERVICE_COORDINATION: (
+        "patient_full_name", "service_type", "appointment_date",
+        "appointment_time", "pickup_time", "pickup_address"
+    ),
+}
+# Resto de fases: siempre relevantes + datos del servicio
+_DEFAULT_RELEVANT_KEYS = (
+    "patient_full_name", "contact_name", "contact_relationship",
+    "service_type", "appointment_date", "appointment_time", "pickup_address",
+)
+
+
 def _format_known_data_for_phase(known_data: Dict[str, Any], phase: ConversationPhase) -> str:
     """
     Formatea datos conocidos relevantes para la fase actual.
     """
-    always_relevant = ["patient_full_name", "contact_name", "contact_relationship"]
-
-    phase_relevant = {
-        ConversationPhase.OUTBOUND_GREETING: [
-            "patient_full_name", "service_type", "appointment_date", "appointment_time", "pickup_time"
-        ],
-        ConversationPhase.OUTBOUND_SERVICE_CONFIRMATION: [
-            "patient_full_name", "service_type", "appointment_date",
-            "appointment_time", "pickup_time", "pickup_address", "contact_name"
-        ],
-        ConversationPhase.OUTBOUND_SPECIAL_CASES: [
-            "patient_full_name", "service_type", "appointment_date",
-            "appointment_time", "pickup_time", "contact_name"
-        ],
-        ConversationPhase.OUTBOUND_CLOSING: [
-            "patient_full_name", "service_type", "appointment_date",
-            "appointment_time", "pickup_time", "contact_name"
-        ],
-        ConversationPhase.IDENTIFICATION: [
-            "patient_full_name", "document_type", "document_number", "eps"
-        ],
-        ConversationPhase.SERVICE_COORDINATION: [
-            "patient_full_name", "service_type", "appointment_date",
-            "appointment_time", "pickup_time", "pickup_address"
-        ],
-    }
-
-    relevant_keys = phase_relevant.get(phase, always_relevant + [
-        "service_type", "appointment_date", "appointment_time", "pickup_address"
-    ])
+    relevant_keys = _PHASE_RELEVANT_KEYS.get(phase, _DEFAULT_RELEVANT_KEYS)
 
     formatted = []
     for key in relevant_keys:
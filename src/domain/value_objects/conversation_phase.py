@@ -56,41 +56,12 @@ class ConversationPhase(str, Enum):
     @property
     def display_name(self) -> str:
         """Get human-readable display name"""
-        display_names = {
-            # Inbound phases
-            self.GREETING: "Saludo",
-            self.IDENTIFICATION: "Identificación",
-            self.LEGAL_NOTICE: "Aviso Legal",
-            self.SERVICE_COORDINATION: "Coordinación de Servicio",
-            self.INCIDENT_MANAGEMENT: "Gestión de Incidencias",
-            self.ESCALATION: "Escalamiento a EPS",
-            self.CLOSING: "Cierre",
-            self.SURVEY: "Encuesta",
-            self.END: "Finalizado",
-            # Outbound phases
-            self.OUTBOUND_GREETING: "Saludo e Identificación (Saliente)",
-            self.OUTBOUND_LEGAL_NOTICE: "Aviso Legal (Saliente)",
-            self.OUTBOUND_SERVICE_CONFIRMATION: "Confirmación de Servicio",
-            self.OUTBOUND_SPECIAL_CASES: "Casos Especiales",
-            self.OUTBOUND_CLOSING: "Cierre (Saliente)"
-        }
-        return display_names.get(self, self.value)
+        return _DISPLAY_NAMES.get(self, self.value)
 
     @property
     def sequence_order(self) -> int:
         """Get the typical order in conversation flow"""
-        order = {
-            self.GREETING: 1,
-            self.IDENTIFICATION: 2,
-            self.LEGAL_NOTICE: 3,
-            self.SERVICE_COORDINATION: 4,
-            self.INCIDENT_MANAGEMENT: 5,
-            self.ESCALATION: 6,
-            self.CLOSING: 7,
-            self.SURVEY: 8,
-            self.END: 9
-        }
-        return order.get(self, 0)
+        return _SEQUENCE_ORDER.get(self, 0)
 
     @property
     def is_terminal(self) -> bool:
@@ -136,79 +107,12 @@ class ConversationPhase(str, Enum):
         if self == next_phase:
             return True
 
-        # Allow specific valid transitions
-        valid_transitions = {
-            # Inbound flow
-            self.GREETING: [self.IDENTIFICATION],
-            self.IDENTIFICATION: [self.LEGAL_NOTICE, self.ESCALATION],
-            self.LEGAL_NOTICE: [self.SERVICE_COORDINATION],
-            self.SERVICE_COORDINATION: [
-                self.INCIDENT_MANAGEMENT,
-                self.ESCALATION,
-                self.CLOSING
-            ],
-            self.INCIDENT_MANAGEMENT: [
-                self.SERVICE_COORDINATION,  # Loop back
-                self.ESCALATION,
-                self.CLOSING
-            ],
-            self.ESCALATION: [self.CLOSING],
-            self.CLOSING: [self.SURVEY],
-            self.SURVEY: [self.END],
-
-            # Outbound flow
-            self.OUTBOUND_GREETING: [self.OUTBOUND_LEGAL_NOTICE],
-            # Allow jumping to special cases if user raises an issue early (complaints, date change, etc.)
-            self.OUTBOUND_LEGAL_NOTICE: [self.OUTBOUND_SERVICE_CONFIRMATION, self.OUTBOUND_SPECIAL_CASES],
-            self.OUTBOUND_SERVICE_CONFIRMATION: [
-                self.OUTBOUND_SPECIAL_CASES,  # If user has questions/issues
-                self.OUTBOUND_CLOSING  # Direct to closing if all confirmed
-            ],
-            self.OUTBOUND_SPECIAL_CASES: [
-                self.OUTBOUND_SERVICE_CONFIRMATION,  # Loop back to confirm changes
-                self.OUTBOUND_CLOSING
-            ],
-            self.OUTBOUND_CLOSING: [self.END]  # Outbound calls skip survey
-        }
-
-        return next_phase in valid_transitions.get(self, [])
+        return next_phase in _TRANSITIONS.get(self, ())
 
     def get_next_phases(self) -> List['ConversationPhase']:
         """Get list of valid next phases from current phase"""
-        transitions = {
-            # Inbound flow
-            self.GREETING: [self.IDENTIFICATION],
-            self.IDENTIFICATION: [self.LEGAL_NOTICE, self.ESCALATION],
-            self.LEGAL_NOTICE: [self.SERVICE_COORDINATION],
-            self.SERVICE_COORDINATION: [
-                self.INCIDENT_MANAGEMENT,
-                self.ESCALATION,
-                self.CLOSING
-            ],
-            self.INCIDENT_MANAGEMENT: [
-                self.SERVICE_COORDINATION,
-                self.ESCALATION,
-                self.CLOSING
-            ],
-            self.ESCALATION: [self.CLOSING],
-            self.CLOSING: [self.SURVEY],
-            self.SURVEY: [self.END],
-            self.END: [],
-
-            # Outbound flow
-            self.OUTBOUND_GREETING: [self.OUTBOUND_LEGAL_NOTICE],
-            self.OUTBOUND_LEGAL_NOTICE: [self.OUTBOUND_SERVICE_CONFIRMATION, self.OUTBOUND_SPECIAL_CASES],
-            self.OUTBOUND_SERVICE_CONFIRMATION: [
-                self.OUTBOUND_SPECIAL_CASES,
-                self.OUTBOUND_CLOSING
-            ],
-            self.OUTBOUND_SPECIAL_CASES: [
-                self.OUTBOUND_SERVICE_CONFIRMATION,
-                self.OUTBOUND_CLOSING
-            ],
-            self.OUTBOUND_CLOSING: [self.END]
-        }
-        return transitions.get(self, [])
+        # Copy: the transitions table is shared
+        return list(_TRANSITIONS.get(self, ()))
 
     @classmethod
     def from_string(cls, value: str) -> 'ConversationPhase':
@@ -224,11 +128,86 @@ class ConversationPhase(str, Enum):
         Raises:
             ValueError: If value is not a valid phase
         """
-        try:
-            return cls[value.upper()]
-        except KeyError:
-            valid_phases = ', '.join([p.value for p in cls])
+        phase = _PHASE_BY_VALUE.get(value) or _PHASE_BY_VALUE.get(value.upper())
+        if phase is None:
+            valid_phases = ', '.join(_PHASE_BY_VALUE)
             raise ValueError(
                 f"Invalid conversation phase: {value}. "
                 f"Valid phases: {valid_phases}"
             )
+        return phase
+
+
+# Lookup tables built once at import (the methods above used to rebuild them
+# on every call). Members are hashable, so they key the dicts directly.
+_PHASE_BY_VALUE = {phase.value: phase for phase in ConversationPhase}
+
+_DISPLAY_NAMES = {
+    # Inbound phases
+    ConversationPhase.GREETING: "Saludo",
+    ConversationPhase.IDENTIFICATION: "Identificación",
+    ConversationPhase.LEGAL_NOTICE: "Aviso Legal",
+    ConversationPhase.SERVICE_COORDINATION: "Coordinación de Servicio",
+    ConversationPhase.INCIDENT_MANAGEMENT: "Gestión de Incidencias",
+    ConversationPhase.ESCALATION: "Escalamiento a EPS",
+    ConversationPhase.CLOSING: "Cierre",
+    ConversationPhase.SURVEY: "Encuesta",
+    ConversationPhase.END: "Finalizado",
+    # Outbound phases
+    ConversationPhase.OUTBOUND_GREETING: "Saludo e Identificación (Saliente)",
+    ConversationPhase.OUTBOUND_LEGAL_NOTICE: "Aviso Legal (Saliente)",
+    ConversationPhase.OUTBOUND_SERVICE_CONFIRMATION: "Confirmación de Servicio",
+    ConversationPhase.OUTBOUND_SPECIAL_CASES: "Casos Especiales",
+    ConversationPhase.OUTBOUND_CLOSING: "Cierre (Saliente)",
+}
+
+_SEQUENCE_ORDER = {
+    ConversationPhase.GREETING: 1,
+    ConversationPhase.IDENTIFICATION: 2,
+    ConversationPhase.LEGAL_NOTICE: 3,
+    ConversationPhase.SERVICE_COORDINATION: 4,
+    ConversationPhase.INCIDENT_MANAGEMENT: 5,
+    ConversationPhase.ESCALATION: 6,
+    ConversationPhase.CLOSING: 7,
+    ConversationPhase.SURVEY: 8,
+    ConversationPhase.END: 9,
+}
+
+# Valid transitions (shared by can_transition_to and get_next_phases)
+_TRANSITIONS = {
+    # Inbound flow
+    ConversationPhase.GREETING: (ConversationPhase.IDENTIFICATION,),
+    ConversationPhase.IDENTIFICATION: (ConversationPhase.LEGAL_NOTICE, ConversationPhase.ESCALATION),
+    ConversationPhase.LEGAL_NOTICE: (ConversationPhase.SERVICE_COORDINATION,),
+    ConversationPhase.SERVICE_COORDINATION: (
+        ConversationPhase.INCIDENT_MANAGEMENT,
+        ConversationPhase.ESCALATION,
+        ConversationPhase.CLOSING,
+    ),
+    ConversationPhase.INCIDENT_MANAGEMENT: (
+        ConversationPhase.SERVICE_COORDINATION,  # Loop back
+        ConversationPhase.ESCALATION,
+        ConversationPhase.CLOSING,
+    ),
+    ConversationPhase.ESCALATION: (ConversationPhase.CLOSING,),
+    ConversationPhase.CLOSING: (ConversationPhase.SURVEY,),
+    ConversationPhase.SURVEY: (ConversationPhase.END,),
+    ConversationPhase.END: (),
+
+    # Outbound flow
+    ConversationPhase.OUTBOUND_GREETING: (ConversationPhase.OUTBOUND_LEGAL_NOTICE,),
+    # Allow jumping to special cases if user raises an issue early (complaints, date change, etc.)
+    ConversationPhase.OUTBOUND_LEGAL_NOTICE: (
+        ConversationPhase.OUTBOUND_SERVICE_CONFIRMATION,
+        ConversationPhase.OUTBOUND_SPECIAL_CASES,
+    ),
+    ConversationPhase.OUTBOUND_SERVICE_CONFIRMATION: (
+        ConversationPhase.OUTBOUND_SPECIAL_CASES,  # If user has questions/issues
+        ConversationPhase.OUTBOUND_CLOSING,  # Direct to closing if all confirmed
+    ),
+    ConversationPhase.OUTBOUND_SPECIAL_CASES: (
+        ConversationPhase.OUTBOUND_SERVICE_CONFIRMATION,  # Loop back to confirm changes
+        ConversationPhase.OUTBOUND_CLOSING,
+    ),
+    ConversationPhase.OUTBOUND_CLOSING: (ConversationPhase.END,),  # Outbound calls skip survey
+}
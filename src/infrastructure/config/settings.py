@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
     REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50  # Shared connection pool size (per worker)
 
     @property
     def redis_connection_url(self) -> str:
@@ -48,6 +49,9 @@ class Settings(BaseSettings):
     EPS_NAME: str = "Cosalud"
     MAX_CONVERSATION_TURNS: int = 50
     SESSION_TTL_SECONDS: int = 3600
+    MAX_ACTIVE_SESSIONS: int = 10000  # In-process session cache size (per worker)
+    MAX_INFLIGHT_MESSAGES: int = 20  # History window passed to the graph each turn
+    SESSION_L1_TTL_SECONDS: float = 1  # Per-worker Redis read cache; bounds cross-worker staleness (0 = off)
 
     # Outbound Calls (Excel Integration)
     EXCEL_PATH: Optional[str] = None  # Path to Excel/CSV file for outbound calls
@@ -58,6 +62,7 @@ class Settings(BaseSettings):
     LANGFUSE_SECRET_KEY: str = ""
     LANGFUSE_HOST: str = "http://localhost:3000"
     LANGFUSE_ENABLED: bool = True
+    LANGFUSE_ENFORCE_FLUSH: bool = False  # Force a (background) flush after every turn
 
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -4,8 +4,8 @@ Logging Configuration
 Provides structured logging for monitoring conversations and system events.
 """
 import logging
-import json
 import sys
+import orjson
 from datetime import datetime
 from typing import Any, Dict, Optional, List
 import logging
@@ -664,7 +664,7 @@ class StructuredFormatter(logging.Formatter):
         if hasattr(record, "escalation_required"):
             log_data["escalation_required"] = record.escalation_required
 
-        return json.dumps(log_data, ensure_ascii=False)
+        return orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 # Global logger instance
@@ -1,6 +1,7 @@
 from src.infrastructure.observability.langfuse_integration import (
     get_langfuse_handler,
     get_langfuse_client,
+    is_langfuse_enabled,
 )
 
-__all__ = ["get_langfuse_handler", "get_langfuse_client"]
+__all__ = ["get_langfuse_handler", "get_langfuse_client", "is_langfuse_enabled"]
@@ -16,6 +16,7 @@ Usage:
     if client:
         client.score(trace_id=handler.get_trace_id(), name="escalation", value=1)
 """
+import atexit
 import logging
 import threading
 from typing import Optional, List, Dict, Any
@@ -39,6 +40,16 @@ def _is_langfuse_available() -> bool:
     return True
 
 
+# Settings are fixed for the life of the process: evaluate once, so the
+# disabled path costs a single global read per turn
+_LANGFUSE_ENABLED = _is_langfuse_available()
+
+
+def is_langfuse_enabled() -> bool:
+    """Whether Langfuse tracing is enabled and configured (callers can skip building trace data)."""
+    return _LANGFUSE_ENABLED
+
+
 def get_langfuse_client():
     """
     Get or create the Langfuse client singleton.
@@ -69,6 +80,7 @@ def get_langfuse_client():
                 host=settings.LANGFUSE_HOST,
             )
             _langfuse_initialized = True
+            atexit.register(flush_langfuse)
             logger.info(f"Langfuse client initialized (host={settings.LANGFUSE_HOST})")
             return _langfuse_client
         except Exception as e:
@@ -102,7 +114,7 @@ def get_langfuse_handler(
     Returns:
         CallbackHandler instance, or None if Langfuse is not available.
     """
-    if not _is_langfuse_available():
+    if not _LANGFUSE_ENABLED:
         return None
 
     try:
@@ -128,9 +140,11 @@ def flush_langfuse():
     """
     Flush pending Langfuse events.
 
-    Call this at the end of each request to ensure data is sent
-    before the response is returned.
+    Blocking (network I/O). Runs automatically at interpreter exit; per-turn
+    flushes are opt-in via LANGFUSE_ENFORCE_FLUSH and run off the request path.
     """
+    if not _LANGFUSE_ENABLED:
+        return
     client = get_langfuse_client()
     if client:
         try:
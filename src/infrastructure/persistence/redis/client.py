@@ -6,8 +6,13 @@ from src.infrastructure.config.settings import Settings
 
 
 def create_redis_client(settings: Settings) -> redis.Redis:
-    return redis.Redis.from_url(
+    # One bounded pool per process, reused by every request (and owned by the client,
+    # so closing the client disconnects it). hiredis is picked up as parser if installed.
+    pool = redis.ConnectionPool.from_url(
         settings.redis_connection_url,
-        decode_responses=True,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        # Sessions are stored as msgpack bytes; keys are decoded by the store
+        decode_responses=False,
     )
+    return redis.Redis.from_pool(pool)
 
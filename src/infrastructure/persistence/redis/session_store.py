@@ -1,33 +1,188 @@
 from __future__ import annotations
 
 import json
+import sys
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+import ormsgpack
 import redis.asyncio as redis
+from cachetools import TTLCache
+from redis.exceptions import ResponseError
+
+
+def _pack(value: Any) -> bytes:
+    return ormsgpack.packb(value)
+
+
+def _unpack(raw: bytes) -> Any:
+    return ormsgpack.unpackb(raw)
+
+
+# Messages go on the wire as (type_idx, content) pairs; anything outside this
+# table (or already stored as a full dict) is kept as a dict.
+_MSG_ENVELOPES = (
+    ("human", "HumanMessage"),
+    ("ai", "AIMessage"),
+    ("system", "SystemMessage"),
+)
+_MSG_TYPE_IDX = {msg_type: idx for idx, (_, msg_type) in enumerate(_MSG_ENVELOPES)}
+
+
+def _pack_message(message: Dict[str, Any]) -> bytes:
+    idx = _MSG_TYPE_IDX.get(message.get("type"))
+    if idx is None:
+        return _pack(message)
+    return _pack((idx, message.get("content", "")))
+
+
+def _unpack_message(raw: bytes) -> Dict[str, Any]:
+    value = _unpack(raw)
+    if isinstance(value, dict):
+        return value
+    idx, content = value
+    role, msg_type = _MSG_ENVELOPES[idx]
+    return {"role": role, "content": content, "type": msg_type}
+
+
+def _copy_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    # Callers mutate what get() returns (dict_to_state works in place), so the
+    # L1 entry is handed out with its own top-level dict, lists and dicts
+    return {
+        field: value.copy() if isinstance(value, (list, dict)) else value
+        for field, value in state.items()
+    }
 
 
 class RedisSessionStore:
-    def __init__(self, client: redis.Redis, *, ttl_seconds: int = 3600, key_prefix: str = "transport:session:"):
+    """
+    Session state in Redis, encoded with msgpack.
+
+    Scalars live in a hash (`<prefix><id>`, one packed value per field) and
+    messages in a list (`<prefix><id>:msgs`), so a turn only has to append
+    its new messages instead of rewriting the whole transcript.
+
+    Decoded sessions are kept for a moment in a per-process L1 cache, so
+    bursts of reads for the same session skip Redis. Every write through
+    this store invalidates the session's entry, but only in this process:
+    with several workers, a write made by another one is not seen here until
+    the entry expires, so l1_ttl_seconds bounds that staleness (0 disables
+    the L1).
+
+    Sessions saved in the previous layout (one JSON string under the same
+    key) are still readable: the first read rewrites them in the current one.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        ttl_seconds: int = 3600,
+        key_prefix: str = "transport:session:",
+        l1_maxsize: int = 10_000,
+        l1_ttl_seconds: float = 1,
+    ):
         self._client = client
         self._ttl = ttl_seconds
         self._prefix = key_prefix
+        self._l1 = TTLCache(maxsize=l1_maxsize, ttl=l1_ttl_seconds)
+        self._l1_enabled = l1_ttl_seconds > 0
+        # session_id -> [reads in flight, generation], only while a Redis read
+        # for that session is pending. Writes bump the generation so a read
+        # that raced a write to the same session doesn't fill the L1
+        self._reads_in_flight: Dict[str, List[int]] = {}
 
     def _key(self, session_id: str) -> str:
         return f"{self._prefix}{session_id}"
 
+    def _msgs_key(self, session_id: str) -> str:
+        return f"{self._prefix}{session_id}:msgs"
+
     async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        cached = self._l1.get(session_id)
+        if cached is not None:
+            return _copy_state(cached)
+
+        in_flight = self._reads_in_flight.setdefault(session_id, [0, 0])
+        in_flight[0] += 1
+        generation = in_flight[1]
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.hgetall(self._key(session_id))
+            pipe.lrange(self._msgs_key(session_id), 0, -1)
+            fields, raw_messages = await pipe.execute(raise_on_error=False)
+        finally:
+            in_flight[0] -= 1
+            if not in_flight[0]:
+                del self._reads_in_flight[session_id]
+        if isinstance(fields, ResponseError):
+            if not str(fields).startswith("WRONGTYPE"):
+                raise fields
+            return await self._migrate_legacy(session_id)
+        if isinstance(raw_messages, ResponseError):
+            raise raw_messages
+        if not fields:
+            return None
+        # Field names are interned so rehydrated sessions share one copy of each
+        # key (the same objects as the ConversationState literals) instead of
+        # holding ~70 freshly decoded strings per session.
+        state = {
+            sys.intern(field.decode("utf-8") if isinstance(field, bytes) else field): _unpack(value)
+            for field, value in fields.items()
+        }
+        state["messages"] = list(map(_unpack_message, raw_messages))
+        if self._l1_enabled and generation == in_flight[1]:
+            self._l1[session_id] = state
+            return _copy_state(state)
+        return state
+
+    async def _migrate_legacy(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Read a session stored as a single JSON string and rewrite it as hash + message list."""
         raw = await self._client.get(self._key(session_id))
         if not raw:
             return None
-        return json.loads(raw)
+        state = json.loads(raw)
+        # Rewritten right away, so later append() calls find a hash
+        await self.set(session_id, state)
+        return state
 
     async def set(self, session_id: str, state: Dict[str, Any]) -> None:
-        state["updated_at"] = datetime.utcnow().isoformat()
-        await self._client.set(self._key(session_id), json.dumps(state, ensure_ascii=False), ex=self._ttl)
+        """Replace the whole session (scalars and messages)."""
+        messages = state.get("messages") or []
+        self._invalidate(session_id)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.delete(self._key(session_id), self._msgs_key(session_id))
+        self._queue_write(pipe, session_id, state, messages)
+        await pipe.execute()
+
+    async def append(self, session_id: str, state: Dict[str, Any], new_messages: Iterable[Any]) -> None:
+        """HSET the given fields (all or just the changed ones) and RPUSH only the new messages."""
+        self._invalidate(session_id)
+        pipe = self._client.pipeline(transaction=True)
+        self._queue_write(pipe, session_id, state, list(new_messages))
+        await pipe.execute()
+
+    def _queue_write(self, pipe, session_id: str, state: Dict[str, Any], messages: list) -> None:
+        # `state` may be a shared snapshot: it is read, never modified
+        key = self._key(session_id)
+        msgs_key = self._msgs_key(session_id)
+        fields = {field: _pack(value) for field, value in state.items() if field != "messages"}
+        fields["updated_at"] = _pack(datetime.utcnow().isoformat())
+        pipe.hset(key, mapping=fields)
+        if messages:
+            pipe.rpush(msgs_key, *map(_pack_message, messages))
+        pipe.expire(key, self._ttl)
+        pipe.expire(msgs_key, self._ttl)
+
+    def _invalidate(self, session_id: str) -> None:
+        in_flight = self._reads_in_flight.get(session_id)
+        if in_flight is not None:
+            in_flight[1] += 1
+        self._l1.pop(session_id, None)
 
     async def delete(self, session_id: str) -> None:
-        await self._client.delete(self._key(session_id))
+        self._invalidate(session_id)
+        await self._client.delete(self._key(session_id), self._msgs_key(session_id))
 
     async def find_all_keys(self, pattern: str = "*") -> list:
         """
@@ -41,4 +196,5 @@ class RedisSessionStore:
         """
         full_pattern = f"{self._prefix}{pattern}"
         keys = await self._client.keys(full_pattern)
-        return [key.decode('utf-8') if isinstance(key, bytes) else key for key in keys]
+        keys = [key.decode('utf-8') if isinstance(key, bytes) else key for key in keys]
+        return [key for key in keys if not key.endswith(":msgs")]
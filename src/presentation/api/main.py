@@ -111,7 +111,11 @@ def create_app() -> FastAPI:
         # Initialize Redis and session store
         redis_client = create_redis_client(settings)
         app.state.redis = redis_client
-        app.state.session_store = RedisSessionStore(redis_client, ttl_seconds=settings.SESSION_TTL_SECONDS)
+        app.state.session_store = RedisSessionStore(
+            redis_client,
+            ttl_seconds=settings.SESSION_TTL_SECONDS,
+            l1_ttl_seconds=settings.SESSION_L1_TTL_SECONDS,
+        )
 
         # Initialize LangGraph orchestrator
         app.state.call_orchestrator = LangGraphOrchestrator(
@@ -130,6 +134,10 @@ def create_app() -> FastAPI:
     @app.on_event("shutdown")
     async def shutdown_event():
         """Shutdown event handler"""
+        # Let in-flight session writes land before closing Redis
+        orchestrator = getattr(app.state, "call_orchestrator", None)
+        if orchestrator is not None:
+            await orchestrator.drain_pending_writes()
         redis_client = getattr(app.state, "redis", None)
         if redis_client is not None:
             await redis_client.close()
@@ -148,5 +156,6 @@ if __name__ == "__main__":
         "main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="auto",  # uvloop when installed (Linux/macOS), asyncio otherwise
     )
@@ -1,6 +1,7 @@
 import pytest
-from langchain_core.messages import HumanMessage
-from src.agent.graph.nodes import input_processor, policy_engine_node, eligibility_checker, escalation_detector
+from langchain_core.messages import AIMessage, HumanMessage
+from src.agent.graph.state import last_human_content
+from src.agent.graph.nodes import input_processor, policy_engine_node, eligibility_checker, escalation_detector, response_processor, turn_start, state_updater, agent_reply
 
 class TestCoreNodes:
     def test_input_processor_updates_turn_count(self):
@@ -44,3 +45,59 @@ class TestCoreNodes:
         }
         result = escalation_detector(state)
         assert result['escalation_required'] == True
+
+    def test_last_human_content_skips_agent_turns(self):
+        messages = [
+            HumanMessage(content='Necesito servicio expreso'),
+            AIMessage(content='Le explico'),
+            HumanMessage(content='Gracias'),
+            AIMessage(content='Servicio expreso no disponible'),
+        ]
+        assert last_human_content(messages) == 'Gracias'
+        assert last_human_content([AIMessage(content='Hola')]) == ''
+
+        result = escalation_detector({'policy_violations': [], 'eligibility_issues': [], 'messages': messages})
+        assert result['escalation_required'] is False
+
+    def test_policy_engine_node_precomputes_policy_ids(self):
+        state = {
+            'messages': [HumanMessage(content='Quiero al conductor Juan')],
+            'current_phase': 'SERVICE_COORDINATION',
+            'call_direction': 'INBOUND'
+        }
+        result = policy_engine_node(state)
+        assert result['policy_ids'] == [v['policy_id'] for v in result['policy_violations']]
+
+    def test_response_processor_merges_extracted_fields(self):
+        state = {
+            'current_phase': 'IDENTIFICATION',
+            'next_phase': 'SERVICE_COORDINATION',
+            'eps': 'Cosalud',
+            'extracted_data': {'contact_name': 'Ana', 'eps': '', 'pickup_address': 'Calle 5', 'unknown_field': 'x'}
+        }
+        result = response_processor(state)
+        assert 'unknown_field' not in result
+        assert result['contact_name'] == 'Ana'
+        assert result['pickup_address'] == 'Calle 5'
+        assert result['eps'] == 'Cosalud'
+        assert result['current_phase'] == 'SERVICE_COORDINATION'
+
+    def test_response_processor_appends_incident(self):
+        state = {'next_phase': 'END', 'extracted_data': {'incident_summary': 'Conductor no llegó'}}
+        result = response_processor(state)
+        assert result['incidents'] == [{'summary': 'Conductor no llegó', 'timestamp': ''}]
+
+        result['extracted_data'] = {'incident_summary': 'Segunda queja'}
+        result = response_processor(result)
+        assert [i['summary'] for i in result['incidents']] == ['Conductor no llegó', 'Segunda queja']
+
+    def test_turn_timestamp_is_reused_downstream(self):
+        state = turn_start({'messages': [HumanMessage(content='Hola')], 'turn_count': 0})
+        stamp = state['_current_timestamp']
+        assert input_processor(state)['updated_at'] == stamp
+        assert state_updater(state)['updated_at'] == stamp
+
+    def test_agent_reply_returns_only_the_new_message(self):
+        result = agent_reply({'messages': [HumanMessage(content='Hola')], 'agent_response': 'Buenos días'})
+        assert [m.content for m in result['messages']] == ['Buenos días']
+        assert agent_reply({'agent_response': ''}) == {}
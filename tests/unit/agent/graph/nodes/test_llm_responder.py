@@ -0,0 +1,42 @@
+import queue
+from types import SimpleNamespace
+
+from src.agent.graph.nodes.llm_responder import (
+    _scan_agent_response,
+    _stream_llm_output,
+    _validate_response_rules,
+)
+
+
+class FakeStreamingLLM:
+    def __init__(self, text, chunk_size=4):
+        self.chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    def stream(self, messages, **kwargs):
+        for chunk in self.chunks:
+            yield SimpleNamespace(content=chunk)
+
+
+class TestLLMResponderStreaming:
+    def test_scan_agent_response_waits_for_closing_quote(self):
+        assert _scan_agent_response('{"agent_response": "Hola, ¿cómo') is None
+        assert _scan_agent_response('{"agent_response": "Hola \\"Juan\\"", "next') == 'Hola "Juan"'
+
+    def test_stream_pushes_agent_response_before_completion(self):
+        raw = '{"agent_response": "Buenos días", "next_phase": "IDENTIFICATION", "extracted": {}}'
+        tts_queue = queue.Queue()
+
+        output = _stream_llm_output(FakeStreamingLLM(raw), [], tts_queue)
+
+        assert output == raw
+        assert tts_queue.get_nowait() == "Buenos días"
+        assert tts_queue.empty()
+
+
+class TestValidateResponseRules:
+    def test_closing_requires_summary(self):
+        result = _validate_response_rules("Para confirmar, su cita es el lunes.", {"next_phase": "END"})
+        assert result["has_critical_error"] is False
+
+        result = _validate_response_rules("Adiós.", {"next_phase": "END"})
+        assert result["errors"] == ["Despedida sin resumen de confirmación"]
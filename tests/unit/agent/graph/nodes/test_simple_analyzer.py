@@ -0,0 +1,57 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.agent.graph.nodes import simple_analyzer
+from src.agent.graph.nodes.simple_analyzer import analyze_message, simple_analyzer_node
+
+
+class TestAnalyzeMessage:
+    def test_intent_priority_follows_pattern_order(self):
+        # Varias categorías coinciden; gana la primera en el orden del dict
+        assert analyze_message("no puedo ir")["user_intent"] == "negar"
+        assert analyze_message("¿a qué hora pasa el conductor?")["user_intent"] == "queja"
+
+    def test_overlapping_policy_keywords_are_all_detected(self):
+        result = analyze_message("Soy el hijo, tengo 15 años y vivo en zona rural")
+        assert result["policy_keywords"] == ["zona_cobertura", "acompanante", "menor_edad"]
+
+    def test_frustration_level(self):
+        result = analyze_message("Estoy molesto!! pésimo servicio, ridículo")
+        assert result["user_emotion"] == "frustración"
+        assert result["user_emotion_level"] == "alto"
+        assert result["needs_empathy"] is True
+
+    def test_first_emotion_in_priority_order_wins(self):
+        # Frustración va antes que confusión, aunque confusión coincida más
+        result = analyze_message("qué problema, no entiendo, puede repetir")
+        assert result["user_emotion"] == "frustración"
+        assert result["user_emotion_level"] == "bajo"
+
+    @pytest.mark.parametrize("message, emotion, level", [
+        ("molesto molesto molesto", "frustración", "bajo"),
+        ("gracias, perfecto, excelente", "positivo", "bajo"),
+        ("no sé cuál es la dirección", "confusión", "bajo"),
+        ("no entiendo, ¿qué significa??", "confusión", "alto"),
+    ])
+    def test_level_counts_distinct_patterns(self, message, emotion, level):
+        # Repetir palabras del mismo patrón no sube el nivel
+        result = analyze_message(message)
+        assert (result["user_emotion"], result["user_emotion_level"]) == (emotion, level)
+        assert result["needs_empathy"] is (level != "bajo" and emotion != "positivo")
+
+    def test_node_merges_analysis_into_state(self):
+        state = simple_analyzer_node({"messages": [HumanMessage(content="gracias")]})
+        assert state["user_emotion"] == "positivo"
+        assert state["policy_keywords"] == []
+
+        state = simple_analyzer_node({"messages": []})
+        assert state["user_intent"] == "otro"
+        assert state["needs_empathy"] is False
+
+    def test_repeated_messages_hit_cache_and_stay_independent(self):
+        first = analyze_message("Soy el hijo")
+        first["policy_keywords"].append("mutado")
+
+        second = analyze_message("  SOY EL HIJO ")
+        assert second["policy_keywords"] == ["acompanante", "menor_edad"]
+        assert simple_analyzer._analyze_normalized.cache_info().hits >= 1
@@ -0,0 +1,87 @@
+import pytest
+from src.agent.graph.nodes.pre_analyzer import PreAnalyzer
+from src.agent.graph.nodes.response_validator import ResponseValidator
+
+
+class FailingLLM:
+    def invoke(self, *args, **kwargs):
+        raise AssertionError("LLM should not be called on the fast path")
+
+
+class TestPreAnalyzerFastPath:
+    @pytest.fixture
+    def analyzer(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
+        analyzer = PreAnalyzer()
+        analyzer.llm = FailingLLM()
+        return analyzer
+
+    @pytest.mark.parametrize("message,intent", [
+        ("Sí", "confirmar"),
+        ("ok.", "confirmar"),
+        ("No!", "negar"),
+        ("Hola", "saludo"),
+    ])
+    def test_short_utterances_skip_llm(self, analyzer, message, intent):
+        analysis = analyzer.analyze(message, phase="GREETING")
+        assert analysis["intent"] == intent
+        assert analysis["policy_keywords"] == []
+        assert analysis["needs_empathy"] is False
+
+
+class TestResponseValidator:
+    def test_regex_corrections(self):
+        response = "Buenos días/tardes, Sr. hijo. Su cita es este LUNES, LUNES a las 8:00."
+        corrected, was_corrected, corrections = ResponseValidator().validate_and_correct(response, {})
+
+        assert corrected == "Buenos días, señor. Su cita es este LUNES a las 8:00."
+        assert was_corrected is True
+        assert "REGEX_FIX: saludo_literal" in corrections
+        assert "REGEX_FIX: parentesco_como_nombre" in corrections
+
+    def test_overlapping_corrections_apply_in_rule_order(self):
+        response = "Su cita es este LUNES, LUNES a las 8."
+        corrected, _, corrections = ResponseValidator().validate_and_correct(response, {})
+
+        # dia_duplicado runs first and leaves nothing for este_dia_duplicado
+        assert corrected == "Su cita es este LUNES a las 8."
+        assert corrections == ["REGEX_FIX: dia_duplicado"]
+
+    def test_extracts_agent_response_from_json(self):
+        response = '{"agent_response": "Hola, ¿en qué le ayudo?", "next_phase": "GREETING"}'
+        corrected, was_corrected, corrections = ResponseValidator().validate_and_correct(response, {})
+
+        assert corrected == "Hola, ¿en qué le ayudo?"
+        assert corrections == ["EXTRACTED_FROM_JSON"]
+
+    def test_extract_from_json_without_json(self):
+        validator = ResponseValidator()
+        assert validator._extract_from_json("agent_response sin llaves") is None
+        assert validator._extract_from_json("{no es json}") is None
+
+    def test_lowercase_triggers_still_corrected(self):
+        corrected, _, corrections = ResponseValidator().validate_and_correct("Gracias, sra. tía.", {})
+        assert corrected == "Gracias, señora."
+        assert corrections == ["REGEX_FIX: parentesco_como_nombre"]
+
+    def test_empty_response_uses_fallback(self):
+        corrected, was_corrected, corrections = ResponseValidator().validate_and_correct(" . ", {})
+        assert was_corrected is True
+        assert corrections == ["FALLBACK: respuesta_vacia"]
+
+    def test_clean_response_untouched(self):
+        corrected, was_corrected, corrections = ResponseValidator().validate_and_correct("Sí, perfecto.", {})
+        assert (corrected, was_corrected, corrections) == ("Sí, perfecto.", False, [])
+
+    def test_empathy_warning_for_frustrated_user(self):
+        state = {"needs_empathy": True, "user_emotion": "frustración"}
+        _, _, corrections = ResponseValidator().validate_and_correct("Su cita es mañana.", state)
+        assert "ADVERTENCIA: Usuario frustrado pero respuesta sin empatía" in corrections
+
+        _, _, corrections = ResponseValidator().validate_and_correct("Entiendo su molestia.", state)
+        assert corrections == []
+
+    def test_policy_warning_for_coverage_promise(self):
+        state = {"policy_keywords": ["zona_cobertura"]}
+        _, _, corrections = ResponseValidator().validate_and_correct("Sí podemos ir a la vereda.", state)
+        assert corrections == ["ADVERTENCIA: Posible violación de política de cobertura"]
@@ -13,7 +13,9 @@ from src.agent.graph.state_adapters import (
     serialize_message,
     deserialize_message,
     state_to_dict,
+    state_to_dict_incremental,
     dict_to_state,
+    state_delta,
     create_initial_state
 )
 
@@ -38,6 +40,11 @@ class TestMessageSerialization:
         assert result["role"] == "ai"
         assert result["content"] == "Hi there"
         assert result["type"] == "AIMessage"
+
+    def test_deserialize_legacy_role_only_message(self):
+        """Test that entries saved without a type fall back to their role"""
+        assert isinstance(deserialize_message({"role": "assistant", "content": "Hola"}), AIMessage)
+        assert isinstance(deserialize_message({"role": "user", "content": "Hola"}), HumanMessage)
     
     def test_roundtrip_serialization(self):
         """Test that state can be serialized and deserialized without loss"""
@@ -68,6 +75,38 @@ class TestMessageSerialization:
         assert deserialized["call_direction"] == "OUTBOUND"
         assert len(deserialized["messages"]) == 2
 
+    def test_incremental_serialization_reuses_previous_messages(self):
+        """Test that only messages added since the previous snapshot are serialized"""
+        state = create_initial_state(session_id="test-incremental", call_direction="INBOUND")
+        state["messages"] = [HumanMessage(content="Hola")]
+        first = state_to_dict_incremental(state)
+
+        state["messages"].append(AIMessage(content="Buenos días"))
+        state["current_phase"] = "IDENTIFICATION"
+        second = state_to_dict_incremental(state, first)
+
+        assert second["messages"][0] is first["messages"][0]
+        assert second["messages"] == state_to_dict(state)["messages"]
+        assert second["current_phase"] == "IDENTIFICATION"
+        assert len(first["messages"]) == 1
+
+
+    def test_state_delta_keeps_changed_scalars_and_all_containers(self):
+        """Test that only changed scalars (plus lists/dicts) are selected for rewrite"""
+        previous = {"current_phase": "GREETING", "turn_count": 1, "incidents": [], "messages": []}
+        current = {"current_phase": "GREETING", "turn_count": 2, "incidents": [], "messages": [{}],
+                   "next_phase": "IDENTIFICATION"}
+
+        assert state_delta(previous, current) == {
+            "turn_count": 2, "incidents": [], "next_phase": "IDENTIFICATION",
+        }
+
+    def test_enum_fields_are_interned_on_load(self):
+        """Test that enum-like string fields share one interned instance"""
+        phase = "".join(["SERVICE_", "COORDINATION"])  # built at runtime, not interned
+        state = dict_to_state({"current_phase": phase, "messages": []})
+        assert state["current_phase"] is dict_to_state({"current_phase": "SERVICE_COORDINATION"})["current_phase"]
+
 
 class TestCreateInitialState:
     """Test initial state creation"""
@@ -83,3 +122,26 @@ class TestCreateInitialState:
         assert state["call_direction"] == "INBOUND"
         assert state["current_phase"] == "GREETING"
         assert state["messages"] == []
+
+    def test_timestamp_cache_is_replaced_as_one_tuple(self, monkeypatch):
+        """Test that a stale cached timestamp is never returned for a new tick"""
+        from src.agent.graph import state_adapters
+
+        monkeypatch.setattr(state_adapters, "_ts_cache", (0, "1970-01-01T00:00:00+00:00"))
+        state = create_initial_state(session_id="ts", call_direction="INBOUND")
+
+        created = datetime.fromisoformat(state["created_at"])
+        assert abs(datetime.now(created.tzinfo) - created).total_seconds() < 5
+        assert state_adapters._ts_cache[1] == state["created_at"]
+
+    def test_initial_states_do_not_share_lists(self):
+        """Test that list fields are fresh per session (not shared via the template)"""
+        first = create_initial_state(session_id="a", call_direction="OUTBOUND", excel_row_index=2)
+        first["messages"].append(HumanMessage(content="Hola"))
+        first["incidents"].append({"summary": "x"})
+
+        second = create_initial_state(session_id="b", call_direction="INBOUND")
+        assert second["messages"] == []
+        assert second["incidents"] == []
+        assert first["current_phase"] == "OUTBOUND_GREETING"
+        assert first["excel_row_index"] == 2
@@ -1,6 +1,8 @@
 import pytest
-from langchain_core.messages import HumanMessage
-from src.agent.policies import PolicyEngine, PolicySeverity
+from langchain_core.messages import AIMessage, HumanMessage
+from src.agent.policies import (
+    CONDUCTOR_001, PolicyEngine, PolicyEvaluationContext, PolicySeverity
+)
 
 class TestPolicyEngine:
     def test_conductor_policy_detects_request(self):
@@ -67,3 +69,176 @@ class TestPolicyEngine:
         state = {'messages': [], 'current_phase': 'GREETING', 'call_direction': 'INBOUND'}
         result = engine.evaluate(state, 'GREETING', 'INBOUND')
         assert len(result.prompt_injection) > 0
+
+    def test_context_uses_last_human_message_only(self):
+        state = {
+            'eps': 'COSALUD',
+            'messages': [
+                HumanMessage(content='Quiero al conductor Juan'),
+                AIMessage(content='Entendido'),
+                HumanMessage(content='Confirmo el servicio'),
+                AIMessage(content='Perfecto, quiero al conductor'),
+            ],
+        }
+        context = PolicyEvaluationContext.from_state(state)
+        assert context.last_human_lower == 'confirmo el servicio'
+        assert context.all_human_lower == ' quiero al conductor juan confirmo el servicio'
+        assert context.all_human_lower is context.all_human_lower
+        assert context.eps_lower == 'cosalud'
+        assert context.pickup_lower == ''
+        assert PolicyEvaluationContext.from_state({'messages': [AIMessage(content='Hola')]}).all_human_lower == ''
+
+        assert CONDUCTOR_001.evaluate(context) is None
+        # A raw state is still accepted
+        assert CONDUCTOR_001.evaluate(state) is None
+
+    def test_context_built_once_per_evaluate(self, monkeypatch):
+        calls = []
+        original = PolicyEvaluationContext.from_state.__func__
+
+        def counting_from_state(cls, state):
+            calls.append(state)
+            return original(cls, state)
+
+        monkeypatch.setattr(PolicyEvaluationContext, 'from_state', classmethod(counting_from_state))
+        state = {
+            'messages': [HumanMessage(content='Quiero servicio expreso, el conductor muy grosero')],
+            'current_phase': 'SERVICE_COORDINATION',
+            'call_direction': 'INBOUND'
+        }
+        result = PolicyEngine().evaluate(state, 'SERVICE_COORDINATION', 'INBOUND')
+
+        assert len(calls) == 1
+        assert {v.policy_id for v in result.violations} == {'MODALIDAD_001', 'CONDUCTOR_COMPLAINT_001'}
+
+    def test_serialized_dict_history_is_evaluated(self):
+        engine = PolicyEngine()
+        state = {
+            'messages': [
+                {'role': 'user', 'content': 'Mi mamá usa silla de ruedas'},
+                {'role': 'assistant', 'content': 'Entendido'},
+                {'role': 'human', 'content': 'Quiero al conductor Juan', 'type': 'HumanMessage'},
+            ],
+            'current_phase': 'SERVICE_COORDINATION',
+            'call_direction': 'INBOUND'
+        }
+        result = engine.evaluate(state, 'SERVICE_COORDINATION', 'INBOUND')
+        assert {v.policy_id for v in result.violations} == {'CONDUCTOR_001', 'SPECIAL_NEEDS_001'}
+
+    def test_keyword_policies_share_one_scan(self, monkeypatch):
+        from src.agent.policies import policy_definitions
+
+        scans = []
+        original = policy_definitions._scan_keywords
+        monkeypatch.setattr(
+            policy_definitions, '_scan_keywords',
+            lambda matcher, text: scans.append(text) or original(matcher, text),
+        )
+        state = {
+            'messages': [
+                HumanMessage(content='Usa oxígeno y silla de ruedas'),
+                HumanMessage(content='Quiero al conductor de siempre, el otro fue grosero'),
+            ],
+        }
+        result = PolicyEngine().evaluate(state, 'SERVICE_COORDINATION', 'INBOUND')
+
+        violations = {v.policy_id: v for v in result.violations}
+        assert set(violations) == {'CONDUCTOR_001', 'CONDUCTOR_COMPLAINT_001', 'SPECIAL_NEEDS_001'}
+        # Highest-priority keyword is reported, not the first one in the text
+        assert violations['SPECIAL_NEEDS_001'].detected_value == 'silla de ruedas'
+        # One pass over the last message, one over the history
+        assert len(scans) == 2
+
+    def test_applicability_is_resolved_once_per_phase_and_direction(self, monkeypatch):
+        from src.agent.policies import Policy
+
+        engine = PolicyEngine()
+        calls = []
+        original = Policy.is_applicable
+        monkeypatch.setattr(Policy, 'is_applicable', lambda self, *a: calls.append(a) or original(self, *a))
+
+        state = {'messages': []}
+        first = engine.evaluate(state, 'SERVICE_COORDINATION', 'OUTBOUND')
+        engine.evaluate(state, 'SERVICE_COORDINATION', 'OUTBOUND')
+        assert calls == []
+        assert 'GEOGRAFIA_001' in first.applicable_policies
+        assert 'SERVICIO_001' not in first.applicable_policies
+
+        # Unknown phases are resolved on first use, then cached
+        engine.evaluate(state, 'CUSTOM_PHASE', 'INBOUND')
+        engine.evaluate(state, 'CUSTOM_PHASE', 'INBOUND')
+        assert len(calls) == len(engine.policies)
+
+    def test_blocking_violations_are_collected_in_the_same_pass(self):
+        state = {
+            'eps': 'Sanitas',
+            'messages': [HumanMessage(content='Quiero al conductor Juan')],
+        }
+        result = PolicyEngine().evaluate(state, 'IDENTIFICATION', 'INBOUND')
+
+        assert result.has_blocking is True
+        assert [v.policy_id for v in result.blocking_violations] == ['SERVICIO_001']
+        assert all(v in result.violations for v in result.blocking_violations)
+
+    def test_policy_lookups_use_the_prebuilt_indexes(self):
+        from src.agent.policies.policy_definitions import (
+            ALL_POLICIES, get_policies_by_category, get_policies_by_severity, get_policy_by_id
+        )
+        from src.agent.policies.policy_schema import PolicyCategory
+
+        assert get_policy_by_id('CONDUCTOR_001') is CONDUCTOR_001
+        assert get_policy_by_id('NOPE') is None
+        assert get_policies_by_severity(PolicySeverity.BLOCKING) == [
+            p for p in ALL_POLICIES if p.severity is PolicySeverity.BLOCKING
+        ]
+        assert [p.id for p in get_policies_by_category(PolicyCategory.CONDUCTOR)] == [
+            'CONDUCTOR_001', 'CONDUCTOR_COMPLAINT_001'
+        ]
+        # Callers get their own list, the index is not exposed
+        get_policies_by_category(PolicyCategory.CONDUCTOR).clear()
+        assert len(get_policies_by_category(PolicyCategory.CONDUCTOR)) == 2
+
+    def test_user_messages_are_lower_cased_once_per_conversation(self):
+        from src.agent.policies.policy_schema import lower_message_text
+
+        lower_message_text.cache_clear()
+        engine = PolicyEngine()
+        messages = [HumanMessage(content='Necesito SILLA de ruedas'), AIMessage(content='Entendido')]
+        engine.evaluate({'messages': messages}, 'SERVICE_COORDINATION', 'INBOUND')
+        first_misses = lower_message_text.cache_info().misses
+
+        messages = messages + [HumanMessage(content='Y el CONDUCTOR fue grosero')]
+        result = engine.evaluate({'messages': messages}, 'SERVICE_COORDINATION', 'INBOUND')
+
+        # Only the new turn is lower-cased on the second evaluation
+        assert lower_message_text.cache_info().misses == first_misses + 1
+        assert {v.policy_id for v in result.violations} >= {'SPECIAL_NEEDS_001', 'CONDUCTOR_COMPLAINT_001'}
+
+    def test_stop_on_blocking_skips_the_remaining_checks(self, monkeypatch):
+        from src.agent.policies import policy_definitions
+
+        history_scans = []
+        original = policy_definitions._history_hits
+        monkeypatch.setattr(
+            policy_definitions, '_history_hits',
+            lambda ctx: history_scans.append(ctx) or original(ctx),
+        )
+        state = {
+            'pickup_address': 'Vereda El Carmen',
+            'messages': [HumanMessage(content='Usa silla de ruedas, quiero al conductor Juan')],
+        }
+        engine = PolicyEngine()
+
+        full = engine.evaluate(state, 'SERVICE_COORDINATION', 'INBOUND')
+        assert [v.policy_id for v in full.violations] == [
+            'CONDUCTOR_001', 'GEOGRAFIA_001', 'SPECIAL_NEEDS_001'
+        ]
+        history_scans.clear()
+
+        short = engine.evaluate(state, 'SERVICE_COORDINATION', 'INBOUND', stop_on_blocking=True)
+        assert short.has_blocking is True
+        assert [v.policy_id for v in short.violations] == ['GEOGRAFIA_001']
+        assert history_scans == []
+        # Applicability and prompt text don't depend on the short-circuit
+        assert short.applicable_policies == full.applicable_policies
+        assert short.prompt_injection == full.prompt_injection
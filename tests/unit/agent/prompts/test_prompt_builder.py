@@ -0,0 +1,33 @@
+from src.agent.prompts.prompt_builder import _output_section, build_prompt
+from src.domain.value_objects.conversation_phase import ConversationPhase
+
+
+class TestBuildPrompt:
+    def test_static_sections_are_rendered_once_per_phase(self):
+        _output_section.cache_clear()
+
+        for _ in range(3):
+            prompt = build_prompt(
+                phase=ConversationPhase.IDENTIFICATION,
+                agent_name="María",
+                company_name="Transpormax",
+                eps_name="Cosalud",
+                known_data={"patient_full_name": "Ana Pérez"},
+            )
+
+        assert _output_section.cache_info().misses == 1
+        assert prompt.startswith("Eres María de Transpormax, autorizado por Cosalud.")
+        assert '"SERVICE_COORDINATION" | "ESCALATION"' in prompt
+        assert "• Patient Full Name: Ana Pérez" in prompt
+
+    def test_unknown_phase_data_uses_default_keys(self):
+        prompt = build_prompt(
+            phase=ConversationPhase.CLOSING,
+            agent_name="María",
+            company_name="Transpormax",
+            eps_name="Cosalud",
+            known_data={"pickup_address": "Calle 1", "document_number": "123"},
+        )
+
+        assert "• Pickup Address: Calle 1" in prompt
+        assert "Document Number" not in prompt
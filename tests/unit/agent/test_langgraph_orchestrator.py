@@ -0,0 +1,427 @@
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.agent.langgraph_orchestrator import (
+    LangGraphOrchestrator,
+    _ShardedTTLCache,
+    _background_tasks,
+    _build_langfuse_handler,
+    _calculate_pickup_time,
+    _fast_uuid4,
+    _record_langfuse_scores,
+    _run_in_background,
+)
+
+
+class TestShardedTTLCache:
+    def test_behaves_like_a_mapping(self):
+        cache = _ShardedTTLCache(maxsize=160, ttl=60)
+        cache["a"] = {"turn_count": 1}
+        cache["a"]["turn_count"] = 2
+
+        assert "a" in cache
+        assert cache["a"] == {"turn_count": 2}
+        assert cache.get("missing") is None
+        assert cache.keys() == ["a"]
+        assert cache.pop("a") == {"turn_count": 2}
+        assert len(cache) == 0
+
+    def test_full_shard_evicts_least_recently_used(self):
+        cache = _ShardedTTLCache(maxsize=16, ttl=60)  # one entry per shard
+        cache[0] = "old"
+        cache[16] = "new"  # same shard as 0
+
+        assert 0 not in cache
+        assert cache[16] == "new"
+
+
+class TestFindSessionByPhone:
+    async def test_hits_phone_map_keyed_by_phone(self):
+        orchestrator = LangGraphOrchestrator()
+        session_id = orchestrator.create_session(patient_phone="3001234567")
+
+        assert await orchestrator.find_session_by_phone("3001234567") == session_id
+        assert await orchestrator.find_session_by_phone("3009999999") is None
+
+    async def test_drops_mapping_to_expired_session_without_store(self):
+        orchestrator = LangGraphOrchestrator()
+        orchestrator._phone_to_session["3001234567"] = "expired"
+
+        assert await orchestrator.find_session_by_phone("3001234567") is None
+        assert "3001234567" not in orchestrator._phone_to_session
+
+    async def test_phone_mapping_is_renewed_while_the_session_is_in_use(self):
+        class RecordingCache(_ShardedTTLCache):
+            def __init__(self):
+                super().__init__(maxsize=160, ttl=60)
+                self.writes = []
+
+            def __setitem__(self, key, value):
+                self.writes.append(key)
+                super().__setitem__(key, value)
+
+        orchestrator = LangGraphOrchestrator()
+        orchestrator._phone_to_session = RecordingCache()
+        session_id = orchestrator.create_session(patient_phone="3001234567")
+
+        await orchestrator.find_session_by_phone("3001234567")
+        orchestrator._renew_phone_mapping(session_id, orchestrator._sessions[session_id])
+
+        # Set on creation, then re-set (TTL renewed) on each lookup and turn
+        assert orchestrator._phone_to_session.writes == ["3001234567"] * 3
+        assert orchestrator._phone_to_session["3001234567"] == session_id
+
+    def test_phone_map_holds_more_entries_than_sessions(self):
+        orchestrator = LangGraphOrchestrator()
+        phone_shard, _ = orchestrator._phone_to_session._shards[0]
+        session_shard, _ = orchestrator._sessions._shards[0]
+
+        assert phone_shard.maxsize > session_shard.maxsize
+
+
+class TestFastUuid4:
+    def test_generates_unique_version_4_uuids(self):
+        ids = [_fast_uuid4() for _ in range(600)]  # spans several entropy refills
+
+        assert len(set(ids)) == len(ids)
+        for value in ids:
+            parsed = uuid.UUID(value)
+            assert parsed.version == 4
+            assert parsed.variant == uuid.RFC_4122
+
+
+class RecordingGraph:
+    """Stand-in for the compiled graph: records the input and appends a reply."""
+
+    def __init__(self):
+        self.inputs = []
+
+    async def ainvoke(self, state, config=None):
+        self.inputs.append(state)
+        return {**state, 'agent_response': 'ok', 'messages': [*state['messages'], AIMessage(content='ok')]}
+
+
+class TestInflightMessageWindow:
+    async def test_graph_sees_only_recent_messages_and_history_is_kept(self):
+        orchestrator = LangGraphOrchestrator()
+        orchestrator.graph = RecordingGraph()
+        orchestrator._inflight_messages = 4
+        history = [HumanMessage(content=str(i)) for i in range(10)]
+        orchestrator._sessions['s1'] = {'messages': history, 'current_phase': 'GREETING'}
+
+        await orchestrator.process_message('s1', 'nuevo')
+
+        sent = orchestrator.graph.inputs[0]['messages']
+        assert [m.content for m in sent] == ['6', '7', '8', '9', 'nuevo']
+        stored = orchestrator._sessions['s1']['messages']
+        assert [m.content for m in stored] == [str(i) for i in range(10)] + ['nuevo', 'ok']
+
+    async def test_rehydrated_history_is_deserialized(self):
+        class Store:
+            async def get(self, session_id):
+                return {'current_phase': 'GREETING', 'messages': [
+                    {'role': 'human', 'content': str(i), 'type': 'HumanMessage'} for i in range(6)
+                ]}
+
+            async def append(self, session_id, state, new_messages):
+                pass
+
+        orchestrator = LangGraphOrchestrator(store=Store())
+        orchestrator.graph = RecordingGraph()
+        orchestrator._inflight_messages = 2
+
+        response = await orchestrator.process_message('s1', 'nuevo')
+
+        assert all(isinstance(m, BaseMessage) for m in orchestrator._sessions['s1']['messages'])
+        assert [m['content'] for m in response['state']['messages']][-2:] == ['nuevo', 'ok']
+
+
+class TestRunInBackground:
+    async def test_runs_call_without_blocking_and_releases_task(self):
+        done = threading.Event()
+
+        _run_in_background(done.set)
+
+        assert len(_background_tasks) == 1
+        await asyncio.gather(*_background_tasks)
+        assert done.is_set()
+        await asyncio.sleep(0)
+        assert not _background_tasks
+
+
+class RecordingStore:
+    def __init__(self):
+        self.appended = []
+        self.fields = []
+
+    async def get(self, session_id):
+        return None
+
+    async def append(self, session_id, state, new_messages):
+        self.appended.append(list(new_messages))
+        self.fields.append(set(state))
+
+
+class TestUnifiedMessagePersistence:
+    async def test_appends_only_new_serialized_messages(self):
+        store = RecordingStore()
+        orchestrator = LangGraphOrchestrator(store=store)
+        orchestrator.graph = RecordingGraph()
+
+        first = await orchestrator.process_unified_message('3001234567', 'hola')
+        await orchestrator.process_unified_message('3001234567', 'sigo aquí')
+        await orchestrator.drain_pending_writes()
+
+        assert [[m['content'] for m in batch] for batch in store.appended] == [
+            ['hola', 'ok'], ['sigo aquí', 'ok'],
+        ]
+        assert store.appended[0][0] is first['state']['messages'][0]
+
+    async def test_second_turn_rewrites_only_changed_fields(self):
+        store = RecordingStore()
+        orchestrator = LangGraphOrchestrator(store=store)
+        orchestrator.graph = RecordingGraph()
+
+        await orchestrator.process_unified_message('3001234567', 'hola')
+        await orchestrator.process_unified_message('3001234567', 'sigo aquí')
+        await orchestrator.drain_pending_writes()
+
+        assert 'session_id' in store.fields[0]
+        assert 'session_id' not in store.fields[1]
+
+    async def test_response_does_not_wait_for_the_write_and_writes_stay_ordered(self):
+        release = asyncio.Event()
+
+        class SlowStore(RecordingStore):
+            async def append(self, session_id, state, new_messages):
+                await release.wait()
+                await super().append(session_id, state, new_messages)
+
+        store = SlowStore()
+        orchestrator = LangGraphOrchestrator(store=store)
+        orchestrator.graph = RecordingGraph()
+
+        first = await orchestrator.process_unified_message('3001234567', 'hola')
+        await orchestrator.process_unified_message('3001234567', 'sigo aquí')
+        assert store.appended == []
+
+        release.set()
+        # A reload after eviction waits for the in-flight writes
+        orchestrator._sessions.pop(first['session_id'])
+        await orchestrator.get_session_async(first['session_id'])
+
+        assert [[m['content'] for m in batch] for batch in store.appended] == [
+            ['hola', 'ok'], ['sigo aquí', 'ok'],
+        ]
+        assert orchestrator._pending_writes == {}
+
+    async def test_cancelled_reader_does_not_cancel_pending_writes(self):
+        release = asyncio.Event()
+
+        class SlowStore(RecordingStore):
+            async def append(self, session_id, state, new_messages):
+                await release.wait()
+                await super().append(session_id, state, new_messages)
+
+        store = SlowStore()
+        orchestrator = LangGraphOrchestrator(store=store)
+        orchestrator._queue_session_write('s1', {'turn_count': 1, 'messages': [{'content': 'hola'}]})
+
+        # A reload of the evicted session waits on the write, then is cancelled
+        reader = asyncio.create_task(orchestrator._rehydrate_session('s1'))
+        await asyncio.sleep(0)
+        reader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reader
+
+        orchestrator._queue_session_write('s1', {
+            'turn_count': 2, 'messages': [{'content': 'hola'}, {'content': 'ok'}],
+        })
+        release.set()
+        await orchestrator.drain_pending_writes()
+
+        assert [[m['content'] for m in batch] for batch in store.appended] == [['hola'], ['ok']]
+
+
+class TestCalculatePickupTime:
+    def test_accepts_excel_time_formats(self):
+        assert _calculate_pickup_time("08:30") == "07:30"
+        assert _calculate_pickup_time("7.15") == "06:15"
+        assert _calculate_pickup_time("07:30:00") == "06:30"
+        assert _calculate_pickup_time("9") == "08:00"
+
+    def test_clamps_to_midnight_and_returns_unparseable_input(self):
+        assert _calculate_pickup_time("00:30") == "00:00"
+        assert _calculate_pickup_time("sin hora") == "sin hora"
+
+
+class TestGetSessionAsync:
+    async def test_reloads_evicted_session_from_store(self):
+        class Store:
+            async def get(self, session_id):
+                return {'current_phase': 'IDENTIFICATION', 'messages': [
+                    {'role': 'ai', 'content': 'Buenos días', 'type': 'AIMessage'},
+                ]} if session_id == 's1' else None
+
+        orchestrator = LangGraphOrchestrator(store=Store())
+
+        session = await orchestrator.get_session_async('s1')
+
+        assert session['current_phase'] == 'IDENTIFICATION'
+        assert isinstance(orchestrator._sessions['s1']['messages'][0], AIMessage)
+        assert await orchestrator.get_session_async('missing') is None
+
+
+class TestRecordLangfuseScores:
+    def test_enqueues_all_scores_for_the_trace(self, monkeypatch):
+        calls = []
+        client = SimpleNamespace(score=lambda **kwargs: calls.append(kwargs))
+        monkeypatch.setattr('src.agent.langgraph_orchestrator.get_langfuse_client', lambda: client)
+        monkeypatch.setattr('src.agent.langgraph_orchestrator.is_langfuse_enabled', lambda: True)
+        handler = SimpleNamespace(get_trace_id=lambda: 'trace-1')
+
+        _record_langfuse_scores(handler, 'GREETING', {
+            'next_phase': 'IDENTIFICATION',
+            'escalation_required': False,
+            'extracted_data': {'patient_full_name': 'Ana', 'eps': None},
+        })
+
+        assert [(c['trace_id'], c['name'], c['value']) for c in calls] == [
+            ('trace-1', 'escalation_triggered', 0),
+            ('trace-1', 'phase_transition', 1),
+            ('trace-1', 'data_extraction_count', 1),
+        ]
+        assert calls[1]['comment'] == 'GREETING -> IDENTIFICATION'
+
+
+class TestLangfuseDisabled:
+    async def test_disabled_tracing_skips_handler_construction(self, monkeypatch):
+        monkeypatch.setattr('src.agent.langgraph_orchestrator.is_langfuse_enabled', lambda: False)
+        monkeypatch.setattr(
+            'src.agent.langgraph_orchestrator._build_langfuse_handler',
+            lambda *args: pytest.fail("handler built while Langfuse is disabled"),
+        )
+        orchestrator = LangGraphOrchestrator()
+        orchestrator.graph = RecordingGraph()
+
+        response = await orchestrator.process_message('s1', 'hola')
+
+        assert response['agent_response'] == 'ok'
+
+
+class StreamingGraph:
+    """Stand-in emitting astream_events(v2)-shaped events for a two-node run."""
+
+    async def astream_events(self, state, config=None, version=None):
+        config['configurable']['agent_response_queue'].put_nowait('Buenos días')
+        await asyncio.sleep(0)
+        yield {'event': 'on_chain_end', 'name': 'llm_responder', 'parent_ids': ['root'],
+               'metadata': {'langgraph_node': 'llm_responder'}, 'data': {'output': {}}}
+        final = {**state, 'agent_response': 'Buenos días',
+                 'messages': [*state['messages'], AIMessage(content='Buenos días')]}
+        yield {'event': 'on_chain_end', 'name': 'LangGraph', 'parent_ids': [],
+               'metadata': {}, 'data': {'output': final}}
+
+
+class TestProcessMessageStream:
+    async def test_yields_early_response_nodes_and_final_response(self):
+        orchestrator = LangGraphOrchestrator()
+        orchestrator.graph = StreamingGraph()
+
+        events = [event async for event in orchestrator.process_message_stream('s1', 'hola')]
+
+        assert [event['type'] for event in events] == ['agent_response', 'node', 'final']
+        assert events[0]['content'] == 'Buenos días'
+        assert events[1]['node'] == 'llm_responder'
+        assert events[-1]['response']['agent_response'] == 'Buenos días'
+        assert [m.content for m in orchestrator._sessions['s1']['messages']] == ['hola', 'Buenos días']
+
+    async def test_streamed_turn_is_saved_to_the_store(self):
+        store = RecordingStore()
+        orchestrator = LangGraphOrchestrator(store=store)
+        orchestrator.graph = StreamingGraph()
+
+        async for event in orchestrator.process_message_stream('s1', 'hola'):
+            if event['type'] == 'final':
+                break
+        await orchestrator.drain_pending_writes()
+
+        assert [[m['content'] for m in batch] for batch in store.appended] == [['hola', 'Buenos días']]
+
+
+class CountingExcelService:
+    def __init__(self, patient=None):
+        self.patient = patient
+        self.lookups = 0
+
+    def get_patient_by_phone(self, phone):
+        self.lookups += 1
+        return self.patient
+
+
+class TestOutboundSessionExcelLookup:
+    async def test_new_outbound_session_reads_excel_once(self):
+        patient = SimpleNamespace(
+            nombre_completo='Ana Gómez', tipo_documento='CC', numero_documento='123', eps='Cosalud',
+            telefono='3001234567', tipo_servicio='Terapia', fecha_servicio='2026-10-20',
+            hora_servicio='08:30', direccion_completa='Calle 1', row_index=7,
+        )
+        excel = CountingExcelService(patient)
+        orchestrator = LangGraphOrchestrator(excel_service=excel)
+
+        response = await orchestrator.process_unified_message('3001234567', 'START', is_outbound=True)
+
+        assert excel.lookups == 1
+        state = orchestrator._sessions[response['session_id']]
+        assert state['patient_full_name'] == 'Ana Gómez'
+        assert state['pickup_time'] == '07:30'
+
+    async def test_only_the_excel_read_leaves_the_event_loop(self, monkeypatch):
+        loop_thread = threading.get_ident()
+        threads = {}
+
+        class ThreadRecordingExcel(CountingExcelService):
+            def get_patient_by_phone(self, phone):
+                threads['excel'] = threading.get_ident()
+                return super().get_patient_by_phone(phone)
+
+        orchestrator = LangGraphOrchestrator(excel_service=ThreadRecordingExcel())
+        create_session = orchestrator.create_session
+
+        def recording_create_session(**kwargs):
+            threads['create_session'] = threading.get_ident()
+            return create_session(**kwargs)
+
+        monkeypatch.setattr(orchestrator, 'create_session', recording_create_session)
+        await orchestrator.process_unified_message('3001234567', 'START', is_outbound=True)
+
+        assert threads['excel'] != loop_thread
+        assert threads['create_session'] == loop_thread
+
+    async def test_patient_not_found_is_not_looked_up_again(self):
+        excel = CountingExcelService(patient=None)
+        orchestrator = LangGraphOrchestrator(excel_service=excel)
+
+        await orchestrator.process_unified_message('3001234567', 'START', is_outbound=True)
+
+        assert excel.lookups == 1
+
+
+class TestBuildLangfuseHandler:
+    def test_tags_use_precomputed_phase_and_service_tags(self, monkeypatch):
+        captured = {}
+        monkeypatch.setattr(
+            'src.agent.langgraph_orchestrator.get_langfuse_handler',
+            lambda **kwargs: captured.update(kwargs),
+        )
+
+        _build_langfuse_handler('s1', {'current_phase': 'IDENTIFICATION', 'service_type': 'Terapia'}, 'OUTBOUND', 'María')
+        assert captured['tags'] == ['outbound', 'phase:IDENTIFICATION', 'service:Terapia']
+
+        _build_langfuse_handler('s1', {'current_phase': 'CUSTOM'}, 'INBOUND', 'María')
+        assert captured['tags'] == ['inbound', 'phase:CUSTOM']
@@ -242,10 +242,17 @@ class TestConversationPhase:
         next_from_end = ConversationPhase.END.get_next_phases()
         assert len(next_from_end) == 0
 
+    def test_conversation_phase_get_next_phases_returns_copy(self):
+        """Mutating the returned list does not change the transitions table"""
+        ConversationPhase.GREETING.get_next_phases().append(ConversationPhase.END)
+        assert ConversationPhase.GREETING.get_next_phases() == [ConversationPhase.IDENTIFICATION]
+        assert ConversationPhase.GREETING.can_transition_to(ConversationPhase.END) is False
+
     def test_conversation_phase_from_string(self):
         """Test creating from string"""
         assert ConversationPhase.from_string("greeting") == ConversationPhase.GREETING
         assert ConversationPhase.from_string("END") == ConversationPhase.END
+        assert ConversationPhase.from_string("Outbound_Closing") is ConversationPhase.OUTBOUND_CLOSING
 
     def test_conversation_phase_from_string_invalid(self):
         """Test invalid string raises ValueError"""
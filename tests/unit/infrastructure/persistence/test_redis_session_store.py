@@ -0,0 +1,230 @@
+"""
+Unit tests for RedisSessionStore (msgpack hash + message list layout).
+
+Uses a minimal in-memory stand-in for the redis.asyncio pipeline API.
+"""
+import json
+import sys
+
+import ormsgpack
+from redis.exceptions import ResponseError
+
+from src.infrastructure.persistence.redis.session_store import RedisSessionStore
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._ops.append((name, args, kwargs))
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        results = []
+        for name, args, kwargs in self._ops:
+            try:
+                results.append(getattr(self._redis, name)(*args, **kwargs))
+            except ResponseError as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.lists = {}
+        self.strings = {}
+        self.rpush_calls = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _check_not_string(self, key):
+        if key in self.strings:
+            raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    def hset(self, key, mapping):
+        self._check_not_string(key)
+        self.hashes.setdefault(key, {}).update({k.encode(): v for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        self._check_not_string(key)
+        return dict(self.hashes.get(key, {}))
+
+    def rpush(self, key, *values):
+        self.rpush_calls.append((key, len(values)))
+        self.lists.setdefault(key, []).extend(values)
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.lists.pop(key, None)
+            self.strings.pop(key, None)
+
+    def expire(self, key, ttl):
+        pass
+
+
+class TestRedisSessionStore:
+    async def test_set_and_get_roundtrip(self):
+        store = RedisSessionStore(FakeRedis())
+        await store.set("s1", {
+            "current_phase": "GREETING",
+            "turn_count": 1,
+            "messages": [{"role": "user", "content": "Hola"}],
+        })
+
+        state = await store.get("s1")
+
+        assert state["current_phase"] == "GREETING"
+        assert state["turn_count"] == 1
+        assert state["messages"] == [{"role": "user", "content": "Hola"}]
+
+    async def test_append_pushes_only_new_messages(self):
+        client = FakeRedis()
+        store = RedisSessionStore(client)
+        await store.set("s1", {"turn_count": 1, "messages": [{"role": "user", "content": "Hola"}]})
+
+        await store.append("s1", {"turn_count": 2}, [{"role": "assistant", "content": "Buenos días"}])
+
+        state = await store.get("s1")
+        assert state["turn_count"] == 2
+        assert [m["content"] for m in state["messages"]] == ["Hola", "Buenos días"]
+        assert client.rpush_calls[-1] == ("transport:session:s1:msgs", 1)
+
+    async def test_missing_session_returns_none(self):
+        assert await RedisSessionStore(FakeRedis()).get("nope") is None
+
+    async def test_legacy_json_session_is_read_and_rewritten(self):
+        client = FakeRedis()
+        # Layout before the msgpack hash: one JSON string, role-only messages
+        client.strings["transport:session:s1"] = json.dumps({
+            "current_phase": "GREETING",
+            "messages": [{"role": "user", "content": "Hola"}, {"role": "assistant", "content": "Buenos días"}],
+        }).encode()
+        store = RedisSessionStore(client)
+
+        state = await store.get("s1")
+
+        assert state["current_phase"] == "GREETING"
+        assert [m["content"] for m in state["messages"]] == ["Hola", "Buenos días"]
+        assert "transport:session:s1" not in client.strings
+        # The session now has the current layout, so appends work
+        await store.append("s1", {"turn_count": 2}, [{"role": "user", "content": "Gracias"}])
+        state = await store.get("s1")
+        assert state["current_phase"] == "GREETING"
+        assert [m["content"] for m in state["messages"]] == ["Hola", "Buenos días", "Gracias"]
+
+    async def test_field_names_are_interned(self):
+        store = RedisSessionStore(FakeRedis())
+        await store.set("s1", {"current_phase": "GREETING", "messages": []})
+
+        state = await store.get("s1")
+
+        assert all(field is sys.intern(field) for field in state)
+
+    async def test_messages_use_compact_envelope_on_the_wire(self):
+        client = FakeRedis()
+        store = RedisSessionStore(client)
+        await store.set("s1", {"messages": [
+            {"role": "ai", "content": "Buenos días", "type": "AIMessage"},
+            {"role": "tool", "content": "x", "type": "ToolMessage"},
+        ]})
+
+        raw = client.lists["transport:session:s1:msgs"]
+        assert ormsgpack.unpackb(raw[0]) == [1, "Buenos días"]
+        state = await store.get("s1")
+        assert state["messages"] == [
+            {"role": "ai", "content": "Buenos días", "type": "AIMessage"},
+            {"role": "tool", "content": "x", "type": "ToolMessage"},
+        ]
+
+    async def test_repeated_reads_are_served_from_l1_until_a_write(self):
+        class CountingRedis(FakeRedis):
+            reads = 0
+
+            def hgetall(self, key):
+                self.reads += 1
+                return super().hgetall(key)
+
+        client = CountingRedis()
+        store = RedisSessionStore(client)
+        await store.set("s1", {"turn_count": 1, "incidents": [], "messages": []})
+
+        first = await store.get("s1")
+        first["incidents"].append({"summary": "x"})
+        first["turn_count"] = 99
+        second = await store.get("s1")
+
+        assert client.reads == 1
+        assert second["turn_count"] == 1
+        assert second["incidents"] == []
+
+        await store.append("s1", {"turn_count": 2}, [])
+        assert (await store.get("s1"))["turn_count"] == 2
+        assert client.reads == 2
+
+    async def test_read_racing_a_write_does_not_fill_l1(self):
+        client = FakeRedis()
+        store = RedisSessionStore(client)
+        await store.set("s1", {"turn_count": 1, "messages": []})
+
+        class RacingPipeline(FakePipeline):
+            async def execute(self, raise_on_error=True):
+                results = await super().execute(raise_on_error)
+                # A write lands while the read's reply is in flight
+                del client.pipeline
+                await store.append("s1", {"turn_count": 2}, [])
+                return results
+
+        client.pipeline = lambda transaction=True: RacingPipeline(client)
+        assert (await store.get("s1"))["turn_count"] == 1
+
+        assert (await store.get("s1"))["turn_count"] == 2
+
+    async def test_write_to_another_session_does_not_block_l1_fill(self):
+        class CountingRedis(FakeRedis):
+            reads = 0
+
+            def hgetall(self, key):
+                self.reads += 1
+                return super().hgetall(key)
+
+        client = CountingRedis()
+        store = RedisSessionStore(client)
+        await store.set("s1", {"turn_count": 1, "messages": []})
+
+        class RacingPipeline(FakePipeline):
+            async def execute(self, raise_on_error=True):
+                results = await super().execute(raise_on_error)
+                del client.pipeline
+                await store.append("s2", {"turn_count": 5}, [])
+                return results
+
+        client.pipeline = lambda transaction=True: RacingPipeline(client)
+        await store.get("s1")
+        await store.get("s1")
+
+        assert client.reads == 1
+        assert store._reads_in_flight == {}
+
+    async def test_zero_ttl_disables_l1(self):
+        client = FakeRedis()
+        store = RedisSessionStore(client, l1_ttl_seconds=0)
+        await store.set("s1", {"turn_count": 1, "messages": []})
+        await store.get("s1")
+
+        # Another worker writes straight to Redis
+        client.hset("transport:session:s1", mapping={"turn_count": ormsgpack.packb(2)})
+        assert (await store.get("s1"))["turn_count"] == 2